@@ -0,0 +1,80 @@
+"""Представление постов и комментариев в JSON API v1."""
+from django.urls import reverse
+
+
+def _absolute(request, url):
+    return request.build_absolute_uri(url) if url else None
+
+
+def serialize_post(request, post):
+    return {
+        'id': post.pk,
+        'text': post.text,
+        'created': post.created,
+        'author': post.author.username,
+        'group': post.group.slug if post.group_id else None,
+        'image': _absolute(request, post.image.url if post.image else None),
+        'thumbnail': _absolute(request, post.thumbnail),
+        'comments_count': post.comments_count,
+        'url': _absolute(
+            request, reverse('api:v1:post_detail', args=(post.pk,)),
+        ),
+    }
+
+
+def serialize_comment(comment):
+    return {
+        'id': comment.pk,
+        'author': comment.author.username,
+        'text': comment.text,
+        'created': comment.created,
+        'parent': comment.parent_id,
+        'depth': comment.depth,
+    }
+
+
+def _page_url(request, **params):
+    query = request.GET.copy()
+    for name in ('page', 'cursor'):
+        query.pop(name, None)
+    query.update(params)
+    return request.build_absolute_uri(f'{request.path}?{query.urlencode()}')
+
+
+def serialize_comments(request, page_obj):
+    """Страница веток комментариев в порядке обхода и ссылка на следующую."""
+    return {
+        'comments': [
+            serialize_comment(comment)
+            for root in page_obj
+            for comment in (root, *root.thread_replies)
+        ],
+        'comments_next': page_obj.next_cursor and _page_url(
+            request, cursor=page_obj.next_cursor,
+        ),
+    }
+
+
+def serialize_page(request, page_obj):
+    """Страница ленты со ссылками на соседние страницы."""
+    if getattr(page_obj, 'is_cursor', False):
+        data = {
+            'next': page_obj.next_cursor and _page_url(
+                request, cursor=page_obj.next_cursor,
+            ),
+            'previous': page_obj.previous_cursor and _page_url(
+                request, cursor=page_obj.previous_cursor,
+            ),
+        }
+    else:
+        data = {
+            'count': page_obj.paginator.count,
+            'next': page_obj.has_next() and _page_url(
+                request, page=page_obj.next_page_number(),
+            ) or None,
+            'previous': page_obj.has_previous() and _page_url(
+                request, page=page_obj.previous_page_number(),
+            ) or None,
+        }
+    data['results'] = [serialize_post(request, post) for post in page_obj]
+    return data
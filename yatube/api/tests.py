@@ -0,0 +1,111 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ApiV1Test(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='Author')
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Тестовый пост',
+            group=cls.group,
+        )
+        cls.comment = Comment.objects.create(
+            post=cls.post,
+            author=cls.reader,
+            text='Тестовый комментарий',
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.reader)
+
+    def test_feeds(self):
+        """Все ленты отдают пост в JSON."""
+        urls = (
+            reverse('api:v1:posts'),
+            reverse('api:v1:group_posts', args=(self.group.slug,)),
+            reverse('api:v1:profile_posts', args=(self.author.username,)),
+            reverse('api:v1:follow'),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                data = response.json()
+                self.assertEqual(data['count'], 1)
+                self.assertEqual(data['results'][0]['id'], self.post.pk)
+                self.assertEqual(
+                    data['results'][0]['group'], self.group.slug,
+                )
+
+    def test_post_detail_with_comments(self):
+        response = self.client.get(
+            reverse('api:v1:post_detail', args=(self.post.pk,)),
+        )
+        data = response.json()
+        self.assertEqual(data['text'], self.post.text)
+        self.assertEqual(data['comments'][0]['text'], self.comment.text)
+
+    def test_missing_objects(self):
+        urls = (
+            reverse('api:v1:post_detail', args=(self.post.pk + 100,)),
+            reverse('api:v1:group_posts', args=('missing',)),
+            reverse('api:v1:profile_posts', args=('missing',)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_follow_requires_login(self):
+        self.client.logout()
+        response = self.client.get(reverse('api:v1:follow'))
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+
+    def test_conditional_get(self):
+        """Повторный запрос с валидаторами получает 304 до изменений."""
+        url = reverse('api:v1:posts')
+        response = self.client.get(url)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+        self.assertIn('public', response['Cache-Control'])
+        etag = response['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Исправленный текст'
+        post.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_comment_changes_post_etag(self):
+        url = reverse('api:v1:post_detail', args=(self.post.pk,))
+        etag = self.client.get(url)['ETag']
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Еще комментарий',
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(len(response.json()['comments']), 2)
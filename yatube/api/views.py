@@ -0,0 +1,108 @@
+from functools import wraps
+from http import HTTPStatus
+
+from django.http import JsonResponse
+from django.views.decorators.cache import cache_control
+
+from core.db_router import replica_reads
+from core.query_budget import query_budget
+from posts.comments import comment_order, comments_page
+from posts.conditional import (
+    conditional_feed, follow_state, group_state, index_state, post_state,
+    profile_state,
+)
+from posts.models import Group, Post, User
+from posts.timeline import timeline_posts
+from posts.views import paginate
+
+from .serializers import serialize_comments, serialize_page, serialize_post
+
+API_VERSION = 'v1'
+JSON_PARAMS = {'ensure_ascii': False}
+
+# Общие ленты одинаковы для всех, их может хранить CDN, но каждый раз
+# сверяя ETag; ленту подписок — только браузер пользователя.
+public_cache = cache_control(public=True, no_cache=True)
+private_cache = cache_control(private=True, no_cache=True)
+
+
+def json_response(data, status=HTTPStatus.OK):
+    return JsonResponse(data, status=status, json_dumps_params=JSON_PARAMS)
+
+
+def not_found():
+    return json_response({'detail': 'Не найдено.'}, HTTPStatus.NOT_FOUND)
+
+
+def login_required(view_func):
+    """Как auth.login_required, но отвечает 403 вместо редиректа."""
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return json_response(
+                {'detail': 'Требуется авторизация.'}, HTTPStatus.FORBIDDEN,
+            )
+        return view_func(request, *args, **kwargs)
+    return wrapper
+
+
+@replica_reads
+@query_budget(4)
+@public_cache
+@conditional_feed(index_state, API_VERSION)
+def posts_list(request):
+    post_list = Post.objects.select_related('author', 'group')
+    return json_response(serialize_page(request, paginate(request, post_list)))
+
+
+@replica_reads
+@query_budget(5)
+@public_cache
+@conditional_feed(group_state, API_VERSION)
+def group_posts(request, slug):
+    group = Group.objects.filter(slug=slug).first()
+    if group is None:
+        return not_found()
+    post_list = group.posts.select_related('author', 'group')
+    return json_response(serialize_page(request, paginate(request, post_list)))
+
+
+@replica_reads
+@query_budget(5)
+@public_cache
+@conditional_feed(profile_state, API_VERSION)
+def profile_posts(request, username):
+    author = User.objects.filter(username=username).first()
+    if author is None:
+        return not_found()
+    post_list = author.posts.select_related('author', 'group')
+    return json_response(serialize_page(request, paginate(request, post_list)))
+
+
+@replica_reads
+@query_budget(7)
+@private_cache
+@login_required
+@conditional_feed(follow_state, API_VERSION)
+def follow_posts(request):
+    post_list = timeline_posts(request.user).select_related(
+        'author', 'group',
+    )
+    return json_response(serialize_page(request, paginate(request, post_list)))
+
+
+@replica_reads
+@query_budget(4)
+@public_cache
+@conditional_feed(post_state, API_VERSION)
+def post_detail(request, post_id):
+    post = Post.objects.select_related('author', 'group').filter(
+        pk=post_id,
+    ).first()
+    if post is None:
+        return not_found()
+    data = serialize_post(request, post)
+    data.update(serialize_comments(request, comments_page(
+        post.pk, comment_order(request), request.GET.get('cursor'),
+    )))
+    return json_response(data)
@@ -0,0 +1,68 @@
+"""Кэширование с защитой от «эффекта толпы» (cache stampede).
+
+Значение хранится вместе со временем его вычисления и логическим
+сроком годности. Запись немного переживает этот срок, поэтому пока
+один воркер пересчитывает значение под блокировкой, остальные отдают
+устаревшее. Пересчет начинается вероятностно чуть раньше срока
+(алгоритм XFetch), так что дорогие записи почти никогда не истекают
+у всех одновременно.
+"""
+import math
+import random
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache as default_cache
+
+LOCK_SUFFIX = ':recompute-lock'
+WAIT_INTERVAL = 0.05
+
+
+def _is_fresh(entry, beta, now):
+    value, delta, expires = entry
+    if expires is None:
+        return True
+    # -log(u) при u из (0, 1] — экспоненциальная поправка: чем дороже
+    # пересчет (delta), тем раньше кто-то из воркеров за него возьмется.
+    return now - delta * beta * math.log(1 - random.random()) < expires
+
+
+def get_or_recompute(key, compute, timeout, cache=None, beta=1.0):
+    """Вернуть значение по ключу, пересчитывая его одним воркером.
+
+    compute вызывается без аргументов. timeout=None — хранить вечно.
+    """
+    cache = cache or default_cache
+    entry = cache.get(key)
+    if entry is not None and _is_fresh(entry, beta, time.time()):
+        return entry[0]
+    lock_key = key + LOCK_SUFFIX
+    token = uuid.uuid4().hex
+    if cache.add(lock_key, token, settings.CACHE_RECOMPUTE_LOCK_TIMEOUT):
+        try:
+            started = time.time()
+            value = compute()
+            finished = time.time()
+            expires = None if timeout is None else finished + timeout
+            cache.set(
+                key,
+                (value, finished - started, expires),
+                None if timeout is None
+                else timeout + settings.CACHE_STALE_TIMEOUT,
+            )
+        finally:
+            # Блокировка могла истечь за долгий пересчет и достаться
+            # другому воркеру: снимаем только свою.
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+        return value
+    if entry is not None:
+        return entry[0]
+    deadline = time.time() + settings.CACHE_RECOMPUTE_LOCK_TIMEOUT
+    while time.time() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+    return compute()
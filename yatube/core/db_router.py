@@ -0,0 +1,95 @@
+"""Чтение лент с реплики, запись — в основную базу.
+
+С реплики читают только GET-запросы к представлениям, помеченным
+replica_reads. Все остальное (формы, команды, фоновые потоки) читает
+основную базу, так что отставание реплики видно только в лентах.
+После запроса, который что-то записал, клиент получает cookie, и
+пока она жива, его запросы тоже читают основную базу: автор сразу
+видит свой пост и комментарий.
+"""
+import threading
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+PRIMARY = 'default'
+REPLICA = 'replica'
+STICKY_COOKIE = 'primary_reads'
+SAFE_METHODS = ('GET', 'HEAD')
+
+_state = threading.local()
+
+
+def replica_reads(view_func):
+    """Разрешить представлению читать с реплики."""
+    view_func.replica_reads = True
+    return view_func
+
+
+def replica_configured():
+    return REPLICA in settings.DATABASES
+
+
+MIRROR_KEYS = ('ENGINE', 'HOST', 'PORT', 'NAME')
+
+
+def _is_mirror():
+    # В тестах реплика — зеркало тестовой основной базы. Одного NAME
+    # мало: у реплики PostgreSQL то же имя базы, но другой хост.
+    replica = connections[REPLICA].settings_dict
+    primary = connections[PRIMARY].settings_dict
+    return all(replica.get(key) == primary.get(key) for key in MIRROR_KEYS)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if getattr(_state, 'replica', False) and not getattr(
+            _state, 'wrote', False,
+        ) and not _is_mirror():
+            return REPLICA
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        _state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
+
+
+class ReplicaRoutingMiddleware:
+    """Включает чтение с реплики на время подходящего запроса."""
+
+    def __init__(self, get_response):
+        if not replica_configured():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _state.replica = False
+        _state.wrote = False
+        try:
+            response = self.get_response(request)
+            wrote = _state.wrote
+        finally:
+            _state.replica = False
+            _state.wrote = False
+        if wrote:
+            response.set_cookie(
+                STICKY_COOKIE,
+                '1',
+                max_age=settings.DATABASE_REPLICA_STICKINESS,
+                httponly=True,
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        _state.replica = (
+            request.method in SAFE_METHODS
+            and getattr(view_func, 'replica_reads', False)
+            and STICKY_COOKIE not in request.COOKIES
+        )
@@ -0,0 +1,181 @@
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.sqlite import TUNED_PRAGMAS, apply_pragmas
+
+SCHEMA = (
+    'CREATE TABLE post (id INTEGER PRIMARY KEY, author_id INTEGER NOT NULL, '
+    'text TEXT NOT NULL, created REAL NOT NULL, comments_count INTEGER '
+    'NOT NULL DEFAULT 0)',
+    'CREATE INDEX post_created_idx ON post (created DESC, id DESC)',
+    'CREATE TABLE comment (id INTEGER PRIMARY KEY, post_id INTEGER NOT NULL, '
+    'text TEXT NOT NULL, created REAL NOT NULL)',
+)
+# Страница главной: COUNT для пагинатора и первые десять постов.
+FEED_QUERIES = (
+    'SELECT COUNT(*) FROM post',
+    'SELECT id, author_id, text, created FROM post '
+    'ORDER BY created DESC, id DESC LIMIT 10',
+)
+# add_comment: комментарий и счетчик поста отдельными транзакциями,
+# как в режиме autocommit Django.
+WRITE_QUERIES = (
+    'INSERT INTO comment (post_id, text, created) VALUES (?, ?, ?)',
+    'UPDATE post SET comments_count = comments_count + 1 WHERE id = ?',
+)
+TEXT = 'Тестовый текст поста ' * 10
+
+
+def _connect(path, pragmas):
+    connection = sqlite3.connect(path, isolation_level=None)
+    apply_pragmas(connection.cursor(), pragmas)
+    return connection
+
+
+def _seed(path, pragmas, rows):
+    connection = _connect(path, pragmas)
+    for statement in SCHEMA:
+        connection.execute(statement)
+    connection.execute('BEGIN')
+    connection.executemany(
+        'INSERT INTO post (author_id, text, created) VALUES (?, ?, ?)',
+        ((number % 100, TEXT, number) for number in range(rows)),
+    )
+    connection.execute('COMMIT')
+    connection.close()
+
+
+class _Stats:
+    """Счетчики потоков нагрузки; потоки сливают их под блокировкой."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reads = self.writes = self.locked = 0
+        self.latencies = []
+
+    def add(self, reads=0, writes=0, locked=0, latencies=()):
+        with self.lock:
+            self.reads += reads
+            self.writes += writes
+            self.locked += locked
+            self.latencies.extend(latencies)
+
+    def summary(self, seconds):
+        latencies = sorted(self.latencies) or [0.0]
+        return {
+            'reads_per_second': round(self.reads / seconds, 1),
+            'writes_per_second': round(self.writes / seconds, 1),
+            'locked_errors': self.locked,
+            'write_p50_ms': round(statistics.median(latencies) * 1000, 2),
+            'write_p95_ms': round(
+                latencies[int(len(latencies) * 0.95)] * 1000, 2,
+            ),
+        }
+
+
+def _read(path, pragmas, stop, stats):
+    connection = _connect(path, pragmas)
+    done = 0
+    while not stop.is_set():
+        try:
+            for query in FEED_QUERIES:
+                connection.execute(query).fetchall()
+            done += 1
+        except sqlite3.OperationalError:
+            stats.add(locked=1)
+    connection.close()
+    stats.add(reads=done)
+
+
+def _write(path, pragmas, stop, stats, worker, rows):
+    connection = _connect(path, pragmas)
+    done, latencies, number = 0, [], 0
+    while not stop.is_set():
+        number += 1
+        post_id = (worker * 7919 + number) % rows + 1
+        start = time.perf_counter()
+        try:
+            connection.execute(
+                WRITE_QUERIES[0], (post_id, TEXT, time.time()),
+            )
+            connection.execute(WRITE_QUERIES[1], (post_id,))
+            done += 1
+            latencies.append(time.perf_counter() - start)
+        except sqlite3.OperationalError:
+            stats.add(locked=1)
+    connection.close()
+    stats.add(writes=done, latencies=latencies)
+
+
+def run_workload(pragmas, readers=4, writers=2, seconds=5.0, rows=20000):
+    """Нагрузить чистую базу читателями и писателями на seconds секунд.
+
+    Возвращает число операций в секунду, ошибки блокировки и задержки
+    записи.
+    """
+    stats = _Stats()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.sqlite3')
+        _seed(path, pragmas, rows)
+        stop = threading.Event()
+        threads = [
+            threading.Thread(target=_read, args=(path, pragmas, stop, stats))
+            for _ in range(readers)
+        ]
+        threads += [
+            threading.Thread(
+                target=_write,
+                args=(path, pragmas, stop, stats, worker, rows),
+            )
+            for worker in range(writers)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+    return stats.summary(seconds)
+
+
+def compare(**options):
+    return {
+        'default': run_workload({}, **options),
+        'tuned': run_workload(TUNED_PRAGMAS, **options),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность SQLite при одновременных '
+        'чтении и записи с настройками по умолчанию и с TUNED_PRAGMAS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--seconds', type=float, default=5.0)
+        parser.add_argument('--rows', type=int, default=20000)
+
+    def handle(self, *args, **options):
+        results = compare(
+            readers=options['readers'],
+            writers=options['writers'],
+            seconds=options['seconds'],
+            rows=options['rows'],
+        )
+        columns = list(results['default'])
+        self.stdout.write(
+            f'{"":10}' + ''.join(f'{column:>20}' for column in columns)
+        )
+        for mode, result in results.items():
+            self.stdout.write(
+                f'{mode:10}'
+                + ''.join(f'{result[column]:>20}' for column in columns)
+            )
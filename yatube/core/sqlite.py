@@ -0,0 +1,31 @@
+"""Настройка соединений SQLite.
+
+Если включен SQLITE_TUNING, каждое новое соединение с SQLite получает
+PRAGMA из TUNED_PRAGMAS. В режиме WAL читатели не ждут пишущего,
+synchronous=NORMAL в WAL не теряет согласованность и избавляет от
+fsync на каждой транзакции, а busy_timeout заставляет конкурирующую
+запись подождать блокировку вместо ошибки «database is locked».
+"""
+from django.conf import settings
+
+TUNED_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 10000,
+    # Отрицательное значение — размер в КиБ, здесь 64 МиБ.
+    'cache_size': -64 * 1024,
+    'mmap_size': 256 * 1024 * 1024,
+}
+
+
+def apply_pragmas(cursor, pragmas):
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def configure_connection(sender, connection, **kwargs):
+    """Обработчик connection_created."""
+    if connection.vendor != 'sqlite' or not settings.SQLITE_TUNING:
+        return
+    with connection.cursor() as cursor:
+        apply_pragmas(cursor, TUNED_PRAGMAS)
@@ -0,0 +1,126 @@
+"""Профилирование рендеринга шаблонов.
+
+Пока включен TEMPLATE_PROFILING, Template._render каждого шаблона,
+в том числе подключенного через include или extends, засекается.
+Для каждого шаблона считаются число рендеров, полное время и
+собственное время без вложенных шаблонов. Итог запроса уходит в
+заголовок Server-Timing (его показывают инструменты разработчика
+браузера) и в лог yatube.template_profiling.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.template.base import Template
+
+logger = logging.getLogger('yatube.template_profiling')
+
+_local = threading.local()
+_original_render = None
+
+
+class TemplateTiming:
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self.own = 0.0
+
+
+class RenderProfile:
+    """Время рендеринга шаблонов в пределах одного запроса."""
+
+    def __init__(self):
+        self.timings = {}
+        self._stack = []
+
+    def _timing(self, name):
+        if name not in self.timings:
+            self.timings[name] = TemplateTiming(name)
+        return self.timings[name]
+
+    def render(self, template, context):
+        name = template.origin.template_name or template.origin.name
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return _original_render(template, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            timing = self._timing(name)
+            timing.count += 1
+            timing.total += elapsed
+            timing.own += elapsed - nested
+
+    def slowest(self):
+        """Шаблоны по убыванию собственного времени."""
+        return sorted(
+            self.timings.values(), key=lambda timing: -timing.own,
+        )
+
+
+def _profiled_render(template, context):
+    profile = getattr(_local, 'profile', None)
+    if profile is None:
+        return _original_render(template, context)
+    return profile.render(template, context)
+
+
+def install():
+    global _original_render
+    if _original_render is None:
+        _original_render = Template._render
+        Template._render = _profiled_render
+
+
+class profiling:
+    """Собирать время шаблонов внутри блока with в RenderProfile."""
+
+    def __enter__(self):
+        install()
+        self.profile = RenderProfile()
+        _local.profile = self.profile
+        return self.profile
+
+    def __exit__(self, *exc_info):
+        _local.profile = None
+
+
+def server_timing(profile, limit):
+    return ', '.join(
+        f'tpl{index};desc="{timing.name} x{timing.count}";'
+        f'dur={timing.own * 1000:.2f}'
+        for index, timing in enumerate(profile.slowest()[:limit])
+    )
+
+
+class TemplateProfilingMiddleware:
+    """Отдает время рендеринга шаблонов в заголовке Server-Timing."""
+
+    def __init__(self, get_response):
+        if not settings.TEMPLATE_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with profiling() as profile:
+            response = self.get_response(request)
+            # TemplateResponse рендерится позже, уже после представлений.
+            if hasattr(response, 'render') and not response.is_rendered:
+                response.render()
+        if profile.timings:
+            response['Server-Timing'] = server_timing(
+                profile, settings.TEMPLATE_PROFILING_LIMIT,
+            )
+            for timing in profile.slowest():
+                logger.debug(
+                    '%s %s: %d раз, %.2f мс, собственное %.2f мс',
+                    request.path, timing.name, timing.count,
+                    timing.total * 1000, timing.own * 1000,
+                )
+        return response
@@ -0,0 +1,83 @@
+from django import template
+from django.core.cache import InvalidCacheBackendError, caches
+from django.core.cache.utils import make_template_fragment_key
+from django.templatetags.cache import CacheNode
+
+from core.cache import get_or_recompute
+
+register = template.Library()
+
+# Записи get_or_recompute — кортежи, а не строки {% cache %}: свой
+# префикс не дает прочитать фрагмент, сохраненный старым тегом.
+KEY_PREFIX = 'fragment_cache.'
+
+
+class SingleFlightCacheNode(CacheNode):
+    """{% cache %}, пересчитываемый одним воркером через get_or_recompute."""
+
+    def render(self, context):
+        try:
+            expire_time = self.expire_time_var.resolve(context)
+        except template.VariableDoesNotExist:
+            raise template.TemplateSyntaxError(
+                f'"fragment_cache" tag got an unknown variable: '
+                f'{self.expire_time_var.var!r}'
+            )
+        if expire_time is not None:
+            try:
+                expire_time = int(expire_time)
+            except (ValueError, TypeError):
+                raise template.TemplateSyntaxError(
+                    f'"fragment_cache" tag got a non-integer timeout '
+                    f'value: {expire_time!r}'
+                )
+        cache_name = (
+            self.cache_name.resolve(context) if self.cache_name
+            else 'template_fragments'
+        )
+        try:
+            fragment_cache = caches[cache_name]
+        except InvalidCacheBackendError:
+            if self.cache_name:
+                raise template.TemplateSyntaxError(
+                    f'Invalid cache name specified for fragment_cache '
+                    f'tag: {cache_name!r}'
+                )
+            fragment_cache = caches['default']
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        return get_or_recompute(
+            KEY_PREFIX + make_template_fragment_key(
+                self.fragment_name, vary_on,
+            ),
+            lambda: self.nodelist.render(context),
+            expire_time,
+            cache=fragment_cache,
+        )
+
+
+@register.tag('fragment_cache')
+def do_fragment_cache(parser, token):
+    """Как {% cache %}, но с единственным пересчетом и отдачей устаревшего.
+
+    {% fragment_cache [expire_time] [fragment_name] [var1] .. %}
+        ..
+    {% endfragment_cache %}
+    """
+    nodelist = parser.parse(('endfragment_cache',))
+    parser.delete_first_token()
+    tokens = token.split_contents()
+    if len(tokens) < 3:
+        raise template.TemplateSyntaxError(
+            f'{tokens[0]!r} tag requires at least 2 arguments.'
+        )
+    cache_name = None
+    if len(tokens) > 3 and tokens[-1].startswith('using='):
+        cache_name = parser.compile_filter(tokens[-1][len('using='):])
+        tokens = tokens[:-1]
+    return SingleFlightCacheNode(
+        nodelist,
+        parser.compile_filter(tokens[1]),
+        tokens[2],
+        [parser.compile_filter(token) for token in tokens[3:]],
+        cache_name,
+    )
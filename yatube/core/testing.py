@@ -0,0 +1,150 @@
+import socketserver
+import threading
+from contextlib import ExitStack
+from email import message_from_bytes
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+
+from .query_budget import get_query_budget
+
+
+class QueryBudgetTestMixin:
+    """Проверки числа SQL-запросов для TestCase."""
+
+    def assertWithinQueryBudget(self, client, url, data=None):
+        """GET url укладывается в бюджет query_budget его представления.
+
+        Считаются запросы ко всем базам, в том числе к реплике.
+        """
+        budget = get_query_budget(resolve(url).func)
+        self.assertIsNotNone(
+            budget, f'У представления для {url} не задан query_budget'
+        )
+        # Зеркало в тестах — тот же объект соединения, его считаем раз.
+        databases = {id(conn): conn for conn in connections.all()}
+        with ExitStack() as stack:
+            captures = [
+                stack.enter_context(CaptureQueriesContext(conn))
+                for conn in databases.values()
+            ]
+            response = client.get(url, data)
+        queries = [
+            f'[{capture.connection.alias}] {query["sql"]}'
+            for capture in captures
+            for query in capture.captured_queries
+        ]
+        self.assertLessEqual(
+            len(queries), budget,
+            f'{url}: {len(queries)} запросов при бюджете {budget}:\n'
+            + '\n'.join(queries),
+        )
+        return response
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def reset(self):
+        self.sender, self.recipients = None, []
+
+    def handle(self):
+        with self.server.lock:
+            self.server.connections += 1
+        self.reply('220 localhost')
+        self.reset()
+        for line in self.rfile:
+            command = line.decode().strip()
+            verb = self.VERBS.get(command[:4].upper(), _SMTPHandler.unknown)
+            if verb(self, command) is False:
+                return
+
+    def hello(self, command):
+        self.reply('250 localhost')
+
+    def mail(self, command):
+        self.sender = command.split(':', 1)[1].strip(' <>')
+        self.reply('250 OK')
+
+    def rcpt(self, command):
+        self.recipients.append(command.split(':', 1)[1].strip(' <>'))
+        self.reply('250 OK')
+
+    def read_data(self):
+        """Тело письма до строки из одной точки, без экранирующих точек."""
+        data = []
+        for line in self.rfile:
+            if line == b'.\r\n':
+                break
+            if line.startswith(b'.'):
+                line = line[1:]
+            data.append(line)
+        return message_from_bytes(b''.join(data))
+
+    def data(self, command):
+        self.reply('354 End data with <CR><LF>.<CR><LF>')
+        message = self.read_data()
+        with self.server.lock:
+            self.server.messages.append(
+                (self.sender, self.recipients, message),
+            )
+        self.reset()
+        self.reply('250 OK')
+
+    def rset(self, command):
+        self.reset()
+        self.reply('250 OK')
+
+    def noop(self, command):
+        self.reply('250 OK')
+
+    def quit(self, command):
+        self.reply('221 Bye')
+        return False
+
+    def unknown(self, command):
+        self.reply('502 Command not implemented')
+
+    VERBS = {
+        'HELO': hello,
+        'EHLO': hello,
+        'MAIL': mail,
+        'RCPT': rcpt,
+        'DATA': data,
+        'RSET': rset,
+        'NOOP': noop,
+        'QUIT': quit,
+    }
+
+
+class LocalSMTPServer(socketserver.ThreadingTCPServer):
+    """SMTP-сервер на свободном порту localhost для тестов почты.
+
+    Принимает все письма и складывает в messages тройки (отправитель,
+    получатели, email.message.Message); connections считает открытые
+    к нему соединения.
+
+        with LocalSMTPServer() as smtp, self.settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST=smtp.host, EMAIL_PORT=smtp.port,
+        ):
+            ...
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _SMTPHandler)
+        self.host, self.port = self.server_address
+        self.messages = []
+        self.connections = 0
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
@@ -1,6 +1,24 @@
 from http import HTTPStatus
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
 
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management import call_command
+from django.db import connection
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+
+from . import db_router
+from .cache import LOCK_SUFFIX, get_or_recompute
+from .sqlite import TUNED_PRAGMAS
+from .template_profiling import profiling
 
 
 class ViewTestClass(TestCase):
@@ -11,3 +29,176 @@ class ViewTestClass(TestCase):
             response.status_code, HTTPStatus.NOT_FOUND
         )
         self.assertTemplateUsed(response, template)
+
+
+class GetOrRecomputeTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_value_is_computed_once(self):
+        """Свежее значение берется из кэша без пересчета."""
+        compute = mock.Mock(return_value='value')
+        for _ in range(3):
+            self.assertEqual(get_or_recompute('key', compute, 60), 'value')
+        compute.assert_called_once()
+
+    def test_stale_value_served_while_locked(self):
+        """Пока другой воркер пересчитывает, отдается устаревшее значение."""
+        cache.set('key', ('old', 0, 0))
+        cache.add('key' + LOCK_SUFFIX, True)
+        value = get_or_recompute('key', lambda: 'new', 60)
+        self.assertEqual(value, 'old')
+
+    def test_expired_value_recomputed(self):
+        """Истекшее значение пересчитывается тем, кто взял блокировку."""
+        cache.set('key', ('old', 0, 0))
+        value = get_or_recompute('key', lambda: 'new', 60)
+        self.assertEqual(value, 'new')
+        self.assertIsNone(cache.get('key' + LOCK_SUFFIX))
+
+    def test_foreign_lock_survives_slow_recompute(self):
+        """Истекшая за пересчет блокировка другого воркера не снимается."""
+        def compute():
+            cache.set('key' + LOCK_SUFFIX, 'other')
+            return 'new'
+
+        self.assertEqual(get_or_recompute('key', compute, 60), 'new')
+        self.assertEqual(cache.get('key' + LOCK_SUFFIX), 'other')
+
+
+class FragmentCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_old_template_cache_entry_ignored(self):
+        """Строка от {% cache %} с тем же именем не ломает тег."""
+        cache.set(make_template_fragment_key('sidebar'), 'старый фрагмент')
+        rendered = Template(
+            '{% load fragment_cache %}'
+            '{% fragment_cache 60 sidebar %}новый{% endfragment_cache %}'
+        ).render(Context())
+        self.assertEqual(rendered, 'новый')
+
+
+class TemplateProfilingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = get_user_model().objects.create_user(username='Author')
+        cls.post = Post.objects.create(author=author, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_includes_are_timed(self):
+        """Вложенные шаблоны учитываются отдельно от родителя."""
+        with profiling() as profile:
+            self.client.get(reverse('posts:index'))
+        for name in ('posts/index.html', 'base.html', 'includes/header.html',
+                     'posts/includes/paginator.html'):
+            with self.subTest(template=name):
+                timing = profile.timings[name]
+                self.assertEqual(timing.count, 1)
+                self.assertLessEqual(timing.own, timing.total)
+        self.assertGreater(
+            profile.timings['posts/index.html'].total,
+            profile.timings['base.html'].total,
+        )
+
+    @override_settings(TEMPLATE_PROFILING=True)
+    def test_server_timing_header(self):
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.post.pk,)),
+        )
+        self.assertIn(
+            'posts/includes/comment.html', response['Server-Timing'],
+        )
+
+
+class ReplicaRoutingTest(TestCase):
+    def setUp(self):
+        self.router = db_router.PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+        # Основная база и реплика PostgreSQL: имя базы одно, хосты разные.
+        self.db_connections = {
+            alias: SimpleNamespace(settings_dict={
+                'ENGINE': 'django.db.backends.postgresql',
+                'HOST': host,
+                'PORT': '',
+                'NAME': 'yatube',
+            })
+            for alias, host in (
+                (db_router.PRIMARY, 'primary.local'),
+                (db_router.REPLICA, 'replica.local'),
+            )
+        }
+
+    def route(self, request, view, write=False):
+        """Пропустить запрос через middleware и вернуть базу для чтения."""
+        used = []
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            if write:
+                self.router.db_for_write(Post)
+            used.append(self.router.db_for_read(Post))
+            return HttpResponse()
+
+        with mock.patch.object(
+            db_router, 'replica_configured', return_value=True,
+        ), mock.patch.object(db_router, 'connections', self.db_connections):
+            middleware = db_router.ReplicaRoutingMiddleware(get_response)
+            response = middleware(request)
+        return used[0], response
+
+    def test_feed_reads_go_to_replica(self):
+        feed = db_router.replica_reads(lambda request: None)
+        database, _ = self.route(self.factory.get('/'), feed)
+        self.assertEqual(database, db_router.REPLICA)
+
+    def test_other_views_read_primary(self):
+        database, _ = self.route(
+            self.factory.get('/'), lambda request: None,
+        )
+        self.assertEqual(database, db_router.PRIMARY)
+        feed = db_router.replica_reads(lambda request: None)
+        database, _ = self.route(self.factory.post('/'), feed)
+        self.assertEqual(database, db_router.PRIMARY)
+
+    def test_test_mirror_reads_primary(self):
+        """Зеркало тестовой базы не считается отдельной репликой."""
+        primary = self.db_connections[db_router.PRIMARY]
+        self.db_connections[db_router.REPLICA] = primary
+        feed = db_router.replica_reads(lambda request: None)
+        database, _ = self.route(self.factory.get('/'), feed)
+        self.assertEqual(database, db_router.PRIMARY)
+
+    def test_reads_follow_writes(self):
+        """После записи клиент какое-то время читает основную базу."""
+        feed = db_router.replica_reads(lambda request: None)
+        database, response = self.route(
+            self.factory.get('/'), feed, write=True,
+        )
+        self.assertEqual(database, db_router.PRIMARY)
+        self.assertIn(db_router.STICKY_COOKIE, response.cookies)
+        request = self.factory.get('/')
+        request.COOKIES[db_router.STICKY_COOKIE] = '1'
+        database, _ = self.route(request, feed)
+        self.assertEqual(database, db_router.PRIMARY)
+        self.assertEqual(self.router.db_for_read(Post), db_router.PRIMARY)
+
+
+class SQLiteTuningTest(TestCase):
+    def test_pragmas_applied_to_connection(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(
+                cursor.fetchone()[0], TUNED_PRAGMAS['busy_timeout'],
+            )
+
+    def test_benchmark_compares_modes(self):
+        out = StringIO()
+        call_command(
+            'bench_sqlite', '--seconds', '0.1', '--rows', '100', stdout=out,
+        )
+        self.assertIn('default', out.getvalue())
+        self.assertIn('tuned', out.getvalue())
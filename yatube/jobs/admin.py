@@ -0,0 +1,52 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .mail import deliver
+from .models import Email, Job
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'task',
+        'status',
+        'attempts',
+        'max_attempts',
+        'run_at',
+        'created',
+    )
+    list_filter = ('status', 'task')
+    search_fields = ('task',)
+    actions = ('retry',)
+
+    def retry(self, request, queryset):
+        retried = queryset.filter(status=Job.FAILED).update(
+            status=Job.QUEUED,
+            attempts=0,
+            run_at=timezone.now(),
+        )
+        self.message_user(request, f'Возвращено в очередь задач: {retried}')
+    retry.short_description = 'Повторить упавшие задачи'
+
+
+class EmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'subject',
+        'recipients',
+        'attempts',
+        'created',
+    )
+    search_fields = ('recipients', 'subject')
+    exclude = ('message',)
+    actions = ('retry',)
+
+    def retry(self, request, queryset):
+        retried = queryset.update(attempts=0, claim='', locked_at=None)
+        deliver.delay()
+        self.message_user(request, f'Письма снова будут отправлены: {retried}')
+    retry.short_description = 'Отправить письма еще раз'
+
+
+admin.site.register(Job, JobAdmin)
+admin.site.register(Email, EmailAdmin)
@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class JobsConfig(AppConfig):
+    name = 'jobs'
+    verbose_name = 'Фоновые задачи'
+
+    def ready(self):
+        # Воркер должен знать задачи всех приложений, даже не открывая
+        # их представления.
+        autodiscover_modules('tasks')
+        from . import mail  # noqa: F401
@@ -0,0 +1,127 @@
+"""Отправка почты через очередь.
+
+QueuedEmailBackend — EMAIL_BACKEND приложения: send_messages только
+сохраняет письма в таблицу Email и ставит задачу deliver, поэтому
+запрос не ждет ни SMTP, ни диска. В таблице лежат готовые байты MIME
+и адреса конверта, а не сериализованные объекты: из них воркер
+собирает письмо заново, ничего не исполняя. Воркер run_jobs забирает письма
+пачками по EMAIL_BATCH_SIZE и отправляет все, что накопилось, через
+одно соединение с настоящим бэкендом EMAIL_DELIVERY_BACKEND.
+
+Письмо, которое не удалось отправить, остается в таблице и уходит
+со следующей попыткой задачи; после JOBS_MAX_ATTEMPTS попыток его
+больше не берут, оно видно в админке с текстом ошибки.
+"""
+import traceback
+from datetime import timedelta
+from email import message_from_bytes
+from email.message import Message
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.message import MIMEMixin
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Email
+from .queue import claim_rows, task
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        emails = []
+        for message in email_messages:
+            if not message.recipients():
+                continue
+            emails.append(Email(
+                subject=str(message.subject)[:255],
+                sender=message.from_email,
+                recipients='\n'.join(message.recipients()),
+                message=message.message().as_bytes(),
+            ))
+        if emails:
+            Email.objects.bulk_create(emails)
+            deliver.delay()
+        return len(emails)
+
+
+class _StoredMIME(MIMEMixin, Message):
+    """Разобранный MIME с as_bytes(linesep=...), как ждут бэкенды Django."""
+
+
+class StoredEmailMessage(EmailMessage):
+    """Письмо из очереди: сохраненный MIME и адреса конверта как есть."""
+
+    def __init__(self, email):
+        super().__init__(
+            subject=email.subject,
+            from_email=email.sender,
+            to=email.recipients.splitlines(),
+        )
+        self.mime = bytes(email.message)
+
+    def message(self):
+        return message_from_bytes(self.mime, _class=_StoredMIME)
+
+
+def release_stale():
+    """Вернуть письма воркеров, не отчитавшихся вовремя."""
+    expired = timezone.now() - timedelta(seconds=settings.JOBS_LEASE_TIMEOUT)
+    return Email.objects.exclude(claim='').filter(
+        locked_at__lt=expired,
+    ).update(claim='', locked_at=None)
+
+
+def claim(limit):
+    token = claim_rows(
+        Email.objects.filter(
+            claim='', attempts__lt=settings.JOBS_MAX_ATTEMPTS,
+        ).order_by('pk'),
+        limit,
+        locked_at=timezone.now(),
+    )
+    return list(Email.objects.filter(claim=token).order_by('pk'))
+
+
+def release(emails):
+    Email.objects.filter(claim=emails[0].claim).update(
+        claim='', locked_at=None,
+    )
+
+
+def send_batch(connection, emails):
+    sent = []
+    try:
+        for email in emails:
+            connection.send_messages([StoredEmailMessage(email)])
+            sent.append(email.pk)
+    except Exception:
+        # Попытка списывается на письмо, на котором отправка сломалась;
+        # недоступный сервер не тратит попыток ни одного письма.
+        Email.objects.filter(pk=email.pk).update(
+            attempts=F('attempts') + 1, last_error=traceback.format_exc(),
+        )
+        raise
+    finally:
+        Email.objects.filter(pk__in=sent).delete()
+    return len(sent)
+
+
+@task(name='jobs.mail.deliver')
+def deliver():
+    """Отправить все накопившиеся письма через одно соединение."""
+    release_stale()
+    emails = claim(settings.EMAIL_BATCH_SIZE)
+    if not emails:
+        return 0
+    sent = 0
+    try:
+        with get_connection(settings.EMAIL_DELIVERY_BACKEND) as connection:
+            while emails:
+                sent += send_batch(connection, emails)
+                emails = claim(settings.EMAIL_BATCH_SIZE)
+    finally:
+        if emails:
+            release(emails)
+    return sent
@@ -0,0 +1,122 @@
+import multiprocessing
+import signal
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection, connections
+
+from jobs import queue
+
+
+def work_loop(batch, interval, stop):
+    """Брать задачи, пока не выставлен stop; без задач — спать."""
+    while not stop.is_set():
+        close_old_connections()
+        if not queue.work(batch):
+            stop.wait(interval)
+    connections.close_all()
+
+
+def _worker(batch, interval, stop):
+    # Ctrl+C получает вся группа процессов; останавливает их родитель,
+    # дав доделать текущую задачу.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    work_loop(batch, interval, stop)
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет фоновые задачи из очереди. По умолчанию работает, '
+        'пока его не остановят; с --once разбирает очередь и выходит.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=1,
+            help='Число процессов-воркеров.',
+        )
+        parser.add_argument(
+            '--batch',
+            type=int,
+            default=10,
+            help='Сколько задач воркер забирает за раз.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Пауза при пустой очереди, секунд.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Выполнить готовые задачи и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            done = 0
+            while True:
+                taken = queue.work(options['batch'])
+                if not taken:
+                    break
+                done += taken
+            self.stdout.write(f'Выполнено задач: {done}')
+            return
+        if options['processes'] < 2:
+            self.run_here(options)
+            return
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            raise CommandError(
+                'Процессы не видят базу SQLite в памяти, '
+                'запустите с --processes 1.'
+            )
+        self.run_pool(options)
+
+    def run_here(self, options):
+        stop = multiprocessing.Event()
+
+        def shutdown(signum, frame):
+            stop.set()
+
+        signal.signal(signal.SIGINT, shutdown)
+        signal.signal(signal.SIGTERM, shutdown)
+        work_loop(options['batch'], options['interval'], stop)
+
+    def run_pool(self, options):
+        stop = multiprocessing.Event()
+        # Дочерние процессы не должны делить открытые соединения.
+        connections.close_all()
+        workers = [
+            multiprocessing.Process(
+                target=_worker,
+                args=(options['batch'], options['interval'], stop),
+                daemon=True,
+            )
+            for _ in range(options['processes'])
+        ]
+        for worker in workers:
+            worker.start()
+
+        def shutdown(signum, frame):
+            stop.set()
+
+        signal.signal(signal.SIGINT, shutdown)
+        signal.signal(signal.SIGTERM, shutdown)
+        self.stdout.write(f'Запущено воркеров: {len(workers)}')
+        while not stop.is_set():
+            # Упавший воркер заменяем, его задачи вернет release_stale.
+            for index, worker in enumerate(workers):
+                if not worker.is_alive():
+                    workers[index] = multiprocessing.Process(
+                        target=_worker,
+                        args=(options['batch'], options['interval'], stop),
+                        daemon=True,
+                    )
+                    workers[index].start()
+            time.sleep(options['interval'])
+        for worker in workers:
+            worker.join()
@@ -0,0 +1,48 @@
+# Generated by Django 2.2.16 on 2026-10-17 06:28
+
+import pickle
+
+from django.db import migrations, models
+
+
+def convert_queued_emails(apps, schema_editor):
+    """Переложить ждущие письма из pickle в MIME и адреса конверта.
+
+    Строки записал прежний код этого же приложения; после миграции
+    pickle из таблицы больше не читается.
+    """
+    Email = apps.get_model('jobs', 'Email')
+    for email in Email.objects.iterator():
+        message = pickle.loads(email.message)
+        email.sender = message.from_email
+        email.recipients = '\n'.join(message.recipients())
+        email.message = message.message().as_bytes()
+        email.save(update_fields=['sender', 'recipients', 'message'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='email',
+            name='sender',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Отправитель'),
+        ),
+        migrations.AlterField(
+            model_name='email',
+            name='message',
+            field=models.BinaryField(verbose_name='Письмо в формате MIME'),
+        ),
+        migrations.AlterField(
+            model_name='email',
+            name='recipients',
+            field=models.TextField(help_text='Адреса конверта, по одному в строке', verbose_name='Получатели'),
+        ),
+        migrations.RunPython(
+            convert_queued_emails, migrations.RunPython.noop,
+        ),
+    ]
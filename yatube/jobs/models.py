@@ -0,0 +1,83 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """Задача в очереди; успешно выполненные задачи удаляются."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Не выполнена'),
+    )
+
+    objects = models.Manager()
+    task = models.CharField('Задача', max_length=200)
+    payload = models.TextField('Аргументы в JSON', default='{}')
+    status = models.CharField(
+        'Состояние',
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=QUEUED,
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток сделано', default=0)
+    max_attempts = models.PositiveSmallIntegerField('Попыток всего')
+    run_at = models.DateTimeField('Выполнить не раньше', default=timezone.now)
+    claim = models.CharField('Метка воркера', max_length=32, blank=True)
+    locked_at = models.DateTimeField('Взята воркером', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created = models.DateTimeField('Дата создания', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'задача'
+        verbose_name_plural = 'задачи'
+        indexes = [
+            models.Index(
+                fields=['run_at', 'id'],
+                condition=models.Q(status='queued'),
+                name='job_queued_idx',
+            ),
+            models.Index(
+                fields=['locked_at'],
+                condition=models.Q(status='running'),
+                name='job_running_idx',
+            ),
+            models.Index(fields=['claim'], name='job_claim_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.task} #{self.pk}'
+
+
+class Email(models.Model):
+    """Письмо, ждущее отправки воркером; отправленные удаляются."""
+    objects = models.Manager()
+    subject = models.CharField('Тема', max_length=255, blank=True)
+    sender = models.CharField('Отправитель', max_length=255, blank=True)
+    recipients = models.TextField(
+        'Получатели',
+        help_text='Адреса конверта, по одному в строке',
+    )
+    message = models.BinaryField('Письмо в формате MIME')
+    attempts = models.PositiveSmallIntegerField('Попыток сделано', default=0)
+    claim = models.CharField('Метка воркера', max_length=32, blank=True)
+    locked_at = models.DateTimeField('Взято воркером', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created = models.DateTimeField('Дата создания', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'письмо'
+        verbose_name_plural = 'письма'
+        indexes = [
+            models.Index(
+                fields=['id'],
+                condition=models.Q(claim=''),
+                name='email_unclaimed_idx',
+            ),
+            models.Index(fields=['claim'], name='email_claim_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} → {self.recipients}'
@@ -0,0 +1,175 @@
+"""Очередь фоновых задач в таблице базы данных.
+
+Задача — функция, помеченная декоратором task; task.delay(...) кладет
+в таблицу Job строку с именем функции и аргументами в JSON, а команда
+run_jobs забирает строки пачками и выполняет. Строка пишется в той же
+базе и транзакции, что и данные запроса, поэтому задача не потеряется
+и не увидит несохраненных данных.
+
+Воркер забирает задачи так, чтобы двое никогда не взяли одну и ту же:
+на PostgreSQL через SELECT ... FOR UPDATE SKIP LOCKED, на SQLite одним
+UPDATE с повторной проверкой состояния (запись в SQLite и так идет по
+одной). Упавшая задача возвращается в очередь с экспоненциальной
+задержкой, после max_attempts попыток остается в таблице со статусом
+failed и текстом ошибки. Задачу воркера, который умер, не закончив ее,
+после JOBS_LEASE_TIMEOUT снова может взять другой воркер.
+"""
+import json
+import logging
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger('yatube.jobs')
+
+TASKS = {}
+
+
+class Task:
+    def __init__(self, func, name, max_attempts):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def __repr__(self):
+        return f'<Task {self.name}>'
+
+    def delay(self, *args, **kwargs):
+        """Поставить вызов в очередь."""
+        return enqueue(self.name, args, kwargs)
+
+
+def task(func=None, *, name=None, max_attempts=None):
+    """Зарегистрировать функцию как задачу очереди.
+
+    Аргументы вызова должны сериализоваться в JSON: передавайте id
+    объектов, а не сами объекты.
+    """
+    def register(func):
+        task_name = name or f'{func.__module__}.{func.__qualname__}'
+        TASKS[task_name] = Task(
+            func,
+            task_name,
+            max_attempts or settings.JOBS_MAX_ATTEMPTS,
+        )
+        return TASKS[task_name]
+    return register(func) if func is not None else register
+
+
+def enqueue(name, args=(), kwargs=None, delay=0):
+    """Добавить задачу; при JOBS_EAGER выполнить ее сразу."""
+    kwargs = kwargs or {}
+    if settings.JOBS_EAGER:
+        TASKS[name](*args, **kwargs)
+        return None
+    return Job.objects.create(
+        task=name,
+        payload=json.dumps(
+            {'args': list(args), 'kwargs': kwargs}, cls=DjangoJSONEncoder,
+        ),
+        max_attempts=TASKS[name].max_attempts,
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def claim_rows(queryset, limit, **fields):
+    """Пометить до limit строк queryset новой меткой claim и вернуть ее.
+
+    Строку, которую уже пометил другой воркер, повторно не пометить:
+    на PostgreSQL ее пропускает SKIP LOCKED, на SQLite UPDATE заново
+    проверяет условия queryset под блокировкой записи.
+    """
+    token = uuid.uuid4().hex
+    model = queryset.model
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(
+                queryset.select_for_update(skip_locked=True)
+                .values_list('pk', flat=True)[:limit]
+            )
+            model.objects.filter(pk__in=ids).update(claim=token, **fields)
+    else:
+        queryset.filter(
+            pk__in=queryset.values('pk')[:limit],
+        ).update(claim=token, **fields)
+    return token
+
+
+def claim(limit):
+    """Забрать до limit готовых к выполнению задач."""
+    now = timezone.now()
+    token = claim_rows(
+        Job.objects.filter(
+            status=Job.QUEUED, run_at__lte=now,
+        ).order_by('run_at', 'pk'),
+        limit,
+        status=Job.RUNNING,
+        locked_at=now,
+        attempts=F('attempts') + 1,
+    )
+    return list(Job.objects.filter(claim=token).order_by('run_at', 'pk'))
+
+
+def release_stale():
+    """Вернуть в очередь задачи воркеров, не отчитавшихся вовремя."""
+    expired = timezone.now() - timedelta(seconds=settings.JOBS_LEASE_TIMEOUT)
+    stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=expired)
+    error = 'Воркер не завершил задачу за JOBS_LEASE_TIMEOUT'
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, claim='', last_error=error,
+    )
+    return failed + stale.update(status=Job.QUEUED, claim='', last_error=error)
+
+
+def retry_delay(attempts):
+    """Пауза перед следующей попыткой: удваивается с каждой неудачей."""
+    return min(
+        settings.JOBS_RETRY_DELAY * 2 ** (attempts - 1),
+        settings.JOBS_RETRY_MAX_DELAY,
+    )
+
+
+def run(job):
+    """Выполнить взятую задачу; True, если она удалась."""
+    try:
+        data = json.loads(job.payload)
+        TASKS[job.task](*data['args'], **data['kwargs'])
+    except Exception:
+        logger.exception('Задача %s упала, попытка %d', job, job.attempts)
+        jobs = Job.objects.filter(pk=job.pk, claim=job.claim)
+        if job.attempts >= job.max_attempts or job.task not in TASKS:
+            jobs.update(
+                status=Job.FAILED, claim='', last_error=traceback.format_exc(),
+            )
+        else:
+            jobs.update(
+                status=Job.QUEUED,
+                claim='',
+                last_error=traceback.format_exc(),
+                run_at=timezone.now() + timedelta(
+                    seconds=retry_delay(job.attempts),
+                ),
+            )
+        return False
+    Job.objects.filter(pk=job.pk, claim=job.claim).delete()
+    return True
+
+
+def work(limit):
+    """Один проход воркера; возвращает число взятых задач."""
+    release_stale()
+    jobs = claim(limit)
+    for job in jobs:
+        run(job)
+    return len(jobs)
@@ -0,0 +1,185 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, send_mail, send_mass_mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.testing import LocalSMTPServer
+
+from . import queue
+from .models import Email, Job
+
+User = get_user_model()
+calls = []
+
+
+@queue.task(name='jobs.tests.record')
+def record(value):
+    calls.append(value)
+
+
+@queue.task(name='jobs.tests.broken', max_attempts=2)
+def broken():
+    raise ValueError('сломано')
+
+
+class JobQueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_delay_queues_and_worker_runs(self):
+        """Задача ждет воркера и удаляется после выполнения."""
+        record.delay('значение')
+        self.assertEqual(calls, [])
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.QUEUED)
+        call_command('run_jobs', '--once', stdout=StringIO())
+        self.assertEqual(calls, ['значение'])
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(JOBS_EAGER=True)
+    def test_eager_runs_inline(self):
+        record.delay(1)
+        self.assertEqual(calls, [1])
+        self.assertFalse(Job.objects.exists())
+
+    def test_claimed_job_is_not_taken_again(self):
+        record.delay(1)
+        taken = queue.claim(10)
+        self.assertEqual(len(taken), 1)
+        self.assertEqual(taken[0].status, Job.RUNNING)
+        self.assertEqual(taken[0].attempts, 1)
+        self.assertEqual(queue.claim(10), [])
+
+    def test_delayed_job_waits(self):
+        queue.enqueue('jobs.tests.record', (1,), delay=60)
+        self.assertEqual(queue.work(10), 0)
+
+    @override_settings(JOBS_RETRY_DELAY=10)
+    def test_failed_job_retries_with_backoff(self):
+        """Упавшая задача откладывается, после max_attempts — failed."""
+        broken.delay()
+        before = timezone.now()
+        with self.assertLogs('yatube.jobs', 'ERROR'):
+            self.assertEqual(queue.work(10), 1)
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertIn('сломано', job.last_error)
+        self.assertGreaterEqual(job.run_at, before + timedelta(seconds=10))
+        self.assertEqual(queue.work(10), 0)
+
+        Job.objects.update(run_at=timezone.now())
+        with self.assertLogs('yatube.jobs', 'ERROR'):
+            queue.work(10)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    @override_settings(JOBS_RETRY_DELAY=10, JOBS_RETRY_MAX_DELAY=60)
+    def test_retry_delay_is_capped(self):
+        self.assertEqual(
+            [queue.retry_delay(attempts) for attempts in range(1, 6)],
+            [10, 20, 40, 60, 60],
+        )
+
+    def test_stale_job_is_released(self):
+        """Задачу умершего воркера берет другой."""
+        record.delay(1)
+        queue.claim(10)
+        Job.objects.update(locked_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(queue.work(10), 1)
+        self.assertEqual(calls, [1])
+
+
+SMTP_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+
+
+@override_settings(EMAIL_BACKEND='jobs.mail.QueuedEmailBackend')
+class QueuedEmailTest(TestCase):
+    def deliver(self, smtp, **settings):
+        with self.settings(
+            EMAIL_DELIVERY_BACKEND=SMTP_BACKEND,
+            EMAIL_HOST=smtp.host,
+            EMAIL_PORT=smtp.port,
+            **settings,
+        ):
+            call_command('run_jobs', '--once', stdout=StringIO())
+
+    def test_password_reset_email_is_queued(self):
+        """Сброс пароля не ждет SMTP, письмо отправляет воркер."""
+        User.objects.create_user('reader', 'reader@example.com', 'pass')
+        with LocalSMTPServer() as smtp:
+            response = self.client.post(
+                reverse('users:password_reset_form'),
+                {'email': 'reader@example.com'},
+            )
+            self.assertRedirects(
+                response, reverse('users:password_reset_done'),
+            )
+            self.assertEqual(Email.objects.count(), 1)
+            self.assertEqual(smtp.connections, 0)
+            self.deliver(smtp)
+        self.assertFalse(Email.objects.exists())
+        self.assertEqual(len(smtp.messages), 1)
+        sender, recipients, message = smtp.messages[0]
+        self.assertEqual(recipients, ['reader@example.com'])
+        body = message.get_payload(decode=True).decode()
+        self.assertIn('/auth/reset/', body)
+
+    def test_batches_share_one_connection(self):
+        send_mass_mail([
+            ('Тема', f'Письмо {number}', 'from@example.com', [
+                f'reader{number}@example.com',
+            ])
+            for number in range(5)
+        ])
+        with LocalSMTPServer() as smtp:
+            self.deliver(smtp, EMAIL_BATCH_SIZE=2)
+        self.assertEqual(len(smtp.messages), 5)
+        self.assertEqual(smtp.connections, 1)
+        self.assertFalse(Email.objects.exists())
+
+    def test_email_stored_as_mime_with_envelope(self):
+        """В таблице MIME и конверт; скрытая копия уходит без заголовка."""
+        EmailMessage(
+            'Тема', 'Текст', 'from@example.com',
+            to=['"Doe, John" <john@example.com>'], bcc=['hidden@example.com'],
+        ).send()
+        email = Email.objects.get()
+        self.assertEqual(
+            email.recipients.splitlines(),
+            ['"Doe, John" <john@example.com>', 'hidden@example.com'],
+        )
+        self.assertIn(b'Subject: =?utf-8?', bytes(email.message))
+        with LocalSMTPServer() as smtp:
+            self.deliver(smtp)
+        sender, recipients, message = smtp.messages[0]
+        self.assertEqual(sender, 'from@example.com')
+        self.assertEqual(
+            recipients, ['john@example.com', 'hidden@example.com'],
+        )
+        self.assertIsNone(message['Bcc'])
+        self.assertEqual(
+            message.get_payload(decode=True).decode().strip(), 'Текст',
+        )
+
+    def test_undelivered_email_waits_for_retry(self):
+        send_mail('Тема', 'Текст', 'from@example.com', ['to@example.com'])
+        with LocalSMTPServer() as smtp:
+            pass
+        with self.assertLogs('yatube.jobs', 'ERROR'):
+            self.deliver(smtp)
+        email = Email.objects.get()
+        self.assertEqual(email.attempts, 0)
+        self.assertEqual(email.claim, '')
+        self.assertEqual(Job.objects.get().status, Job.QUEUED)
+
+        with LocalSMTPServer() as smtp:
+            Job.objects.update(run_at=timezone.now())
+            self.deliver(smtp)
+        self.assertEqual(len(smtp.messages), 1)
+        self.assertFalse(Email.objects.exists())
@@ -0,0 +1,19 @@
+from django.contrib import admin
+
+from .models import Notification
+
+
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'recipient',
+        'post',
+        'created',
+        'is_read',
+        'emailed',
+    )
+    list_filter = ('is_read', 'emailed')
+    raw_id_fields = ('recipient', 'post')
+
+
+admin.site.register(Notification, NotificationAdmin)
@@ -0,0 +1,109 @@
+"""Дайджесты уведомлений по почте.
+
+Первое уведомление после затишья ставит задачу send_digests через
+NOTIFICATIONS_DIGEST_INTERVAL секунд; все посты, вышедшие за это
+время, придут получателю одним письмом. Получатели обходятся пачками
+по ключу, письма пачки уходят одним send_messages в очередь почты.
+Уведомления, прочитанные на сайте до отправки, в письмо не попадают.
+"""
+from itertools import groupby
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Max
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from jobs.models import Job
+from jobs.queue import enqueue
+
+from .models import Notification, User
+
+DIGEST_TASK = 'notifications.tasks.send_digests'
+
+
+def _digest_jobs(*statuses):
+    return Job.objects.filter(task=DIGEST_TASK, status__in=statuses)
+
+
+def schedule():
+    """Поставить отправку дайджестов, если она еще не ждет и не идет."""
+    if not _digest_jobs(Job.QUEUED, Job.RUNNING).exists():
+        enqueue(DIGEST_TASK, delay=settings.NOTIFICATIONS_DIGEST_INTERVAL)
+
+
+def schedule_leftovers():
+    """Поставить следующую отправку для пришедших во время рассылки.
+
+    Пока рассылка идет, schedule() новую не ставит, поэтому после нее
+    оставшиеся уведомления проверяются здесь.
+    """
+    if (
+        Notification.objects.filter(emailed=False).exists()
+        and not _digest_jobs(Job.QUEUED).exists()
+    ):
+        enqueue(DIGEST_TASK, delay=settings.NOTIFICATIONS_DIGEST_INTERVAL)
+
+
+def _message(user, notifications):
+    shown = notifications[:settings.NOTIFICATIONS_DIGEST_POSTS]
+    context = {
+        'user': user,
+        'notifications': shown,
+        'more': len(notifications) - len(shown),
+        'site_url': settings.SITE_URL,
+        'notifications_url': settings.SITE_URL + reverse(
+            'notifications:index',
+        ),
+    }
+    subject = render_to_string('notifications/digest_subject.txt', context)
+    return EmailMessage(
+        ''.join(subject.splitlines()),
+        render_to_string('notifications/digest_email.txt', context),
+        to=[user.email],
+    )
+
+
+def send_batch(recipient_ids, connection):
+    pending = Notification.objects.filter(
+        recipient_id__in=recipient_ids, emailed=False,
+    )
+    # Уведомления, разложенные уже после выборки, дождутся следующего
+    # дайджеста, а не пометятся отправленными без письма.
+    last_pk = pending.aggregate(Max('pk'))['pk__max']
+    if last_pk is None:
+        # Уведомления успели прочитать и разослать, пока шла выборка.
+        return 0
+    pending = pending.filter(pk__lte=last_pk)
+    users = User.objects.exclude(email='').in_bulk(recipient_ids)
+    unread = pending.filter(
+        is_read=False, recipient_id__in=list(users),
+    ).select_related('post__author').order_by('recipient', '-created', '-pk')
+    messages = [
+        _message(users[recipient_id], list(notifications))
+        for recipient_id, notifications in groupby(
+            unread, key=lambda notification: notification.recipient_id,
+        )
+    ]
+    connection.send_messages(messages)
+    pending.update(emailed=True)
+    return len(messages)
+
+
+def send_digests():
+    """Разослать дайджесты всем, у кого есть неразосланные уведомления."""
+    sent = 0
+    last_id = 0
+    connection = get_connection()
+    while True:
+        recipient_ids = list(
+            Notification.objects.filter(
+                emailed=False, recipient_id__gt=last_id,
+            ).order_by('recipient_id').values_list(
+                'recipient_id', flat=True,
+            ).distinct()[:settings.NOTIFICATIONS_BATCH_SIZE]
+        )
+        if not recipient_ids:
+            return sent
+        sent += send_batch(recipient_ids, connection)
+        last_id = recipient_ids[-1]
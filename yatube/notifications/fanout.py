@@ -0,0 +1,54 @@
+"""Раскладка уведомлений о новом посте по подписчикам автора.
+
+Выполняется воркером очереди, а не в запросе: у автора могут быть
+сотни тысяч подписчиков. Подписчики читаются итератором и пишутся
+пачками по NOTIFICATIONS_BATCH_SIZE через bulk_create; уникальность
+(получатель, пост) делает повтор упавшей задачи безопасным.
+"""
+from django.conf import settings
+
+from posts.models import Follow, Post
+
+from .models import Notification
+from .unread import forget
+
+
+def notify_followers(post_id):
+    """Уведомить подписчиков автора о посте; вернуть число уведомлений."""
+    post = Post.objects.filter(pk=post_id).only(
+        'pk', 'author_id', 'created',
+    ).first()
+    if post is None:
+        return 0
+    follower_ids = Follow.objects.filter(
+        author_id=post.author_id,
+    ).values_list('user_id', flat=True).order_by()
+    created = 0
+    batch = []
+    for user_id in follower_ids.iterator(settings.NOTIFICATIONS_BATCH_SIZE):
+        batch.append(user_id)
+        if len(batch) >= settings.NOTIFICATIONS_BATCH_SIZE:
+            created += _insert(post, batch)
+            batch = []
+    if batch:
+        created += _insert(post, batch)
+    return created
+
+
+def _insert(post, user_ids):
+    """Создать недостающие уведомления пачки; вернуть, сколько создано."""
+    existing = set(Notification.objects.filter(
+        post=post, recipient_id__in=user_ids,
+    ).values_list('recipient_id', flat=True))
+    new_ids = [user_id for user_id in user_ids if user_id not in existing]
+    # ignore_conflicts — на случай, если параллельный повтор задачи
+    # успел вставить те же строки.
+    Notification.objects.bulk_create(
+        [
+            Notification(recipient_id=user_id, post=post, created=post.created)
+            for user_id in new_ids
+        ],
+        ignore_conflicts=True,
+    )
+    forget(new_ids)
+    return len(new_ids)
@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+from posts.models import Post
+
+User = get_user_model()
+
+
+class Notification(models.Model):
+    """Уведомление подписчику о новом посте автора."""
+    objects = models.Manager()
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name='Получатель',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name='Пост',
+    )
+    created = models.DateTimeField('Дата создания поста')
+    is_read = models.BooleanField('Прочитано', default=False)
+    emailed = models.BooleanField('Попало в дайджест', default=False)
+
+    class Meta:
+        verbose_name = 'уведомление'
+        verbose_name_plural = 'уведомления'
+        indexes = [
+            models.Index(
+                fields=['recipient', '-created', '-id'],
+                name='notification_recipient_idx',
+            ),
+            models.Index(
+                fields=['recipient'],
+                condition=models.Q(is_read=False),
+                name='notification_unread_idx',
+            ),
+            models.Index(
+                fields=['recipient'],
+                condition=models.Q(emailed=False),
+                name='notification_digest_idx',
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['recipient', 'post'],
+                name='unique_notification',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.recipient} ← {self.post_id}'
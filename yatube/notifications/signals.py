@@ -0,0 +1,13 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from posts.models import Post
+
+from .tasks import notify_followers
+
+
+@receiver(post_save, sender=Post)
+def queue_follower_notifications(sender, instance, created, raw=False,
+                                 **kwargs):
+    if created and not raw:
+        notify_followers.delay(instance.pk)
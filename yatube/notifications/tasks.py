@@ -0,0 +1,15 @@
+from jobs.queue import task
+
+from . import digests, fanout
+
+
+@task
+def notify_followers(post_id):
+    if fanout.notify_followers(post_id):
+        digests.schedule()
+
+
+@task(name=digests.DIGEST_TASK)
+def send_digests():
+    digests.send_digests()
+    digests.schedule_leftovers()
@@ -0,0 +1,118 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from jobs.models import Job
+from posts.models import Follow, Post
+
+from . import digests
+from .fanout import notify_followers
+from .models import Notification
+from .unread import unread_count
+
+User = get_user_model()
+
+
+class NotificationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user('author')
+        self.followers = [
+            User.objects.create_user(
+                f'reader{number}', f'reader{number}@example.com',
+            )
+            for number in range(5)
+        ]
+        Follow.objects.bulk_create(
+            Follow(user=follower, author=self.author)
+            for follower in self.followers
+        )
+        self.reader = Client()
+        self.reader.force_login(self.followers[0])
+
+    def test_new_post_notifies_followers_in_background(self):
+        """Пост ставит задачу, воркер раскладывает уведомления."""
+        author = Client()
+        author.force_login(self.author)
+        author.post(reverse('posts:post_create'), {'text': 'Новый пост'})
+        self.assertFalse(Notification.objects.exists())
+        call_command('run_jobs', '--once', stdout=StringIO())
+        post = Post.objects.get()
+        self.assertEqual(
+            set(Notification.objects.values_list('recipient', 'post')),
+            {(follower.pk, post.pk) for follower in self.followers},
+        )
+        digest = Job.objects.get(task=digests.DIGEST_TASK)
+        self.assertGreater(digest.run_at, post.created)
+
+    @override_settings(NOTIFICATIONS_BATCH_SIZE=2)
+    def test_fan_out_is_chunked_and_idempotent(self):
+        post = Post.objects.create(author=self.author, text='Пост')
+        self.assertEqual(notify_followers(post.pk), 5)
+        Notification.objects.filter(recipient=self.followers[0]).delete()
+        self.assertEqual(notify_followers(post.pk), 1)
+        self.assertEqual(Notification.objects.count(), 5)
+
+    def test_unread_counter_in_header(self):
+        """Счетчик кэшируется, сбрасывается новым уведомлением и чтением."""
+        self.assertEqual(unread_count(self.followers[0]), 0)
+        post = Post.objects.create(author=self.author, text='Пост')
+        notify_followers(post.pk)
+        response = self.reader.get(reverse('posts:index'))
+        self.assertEqual(response.context['unread_notifications'], 1)
+
+        response = self.reader.get(reverse('notifications:index'))
+        self.assertEqual(list(response.context['page_obj'])[0].post, post)
+        self.assertEqual(unread_count(self.followers[0]), 0)
+        self.assertEqual(unread_count(self.followers[1]), 1)
+
+    def test_digest_collapses_posts_into_one_email(self):
+        posts = [
+            Post.objects.create(author=self.author, text=f'Пост {number}')
+            for number in range(3)
+        ]
+        for post in posts:
+            notify_followers(post.pk)
+        Notification.objects.filter(recipient=self.followers[1]).update(
+            is_read=True,
+        )
+        with self.settings(NOTIFICATIONS_BATCH_SIZE=2):
+            self.assertEqual(digests.send_digests(), 4)
+        self.assertEqual(len(mail.outbox), 4)
+        message = next(
+            message for message in mail.outbox
+            if message.to == ['reader0@example.com']
+        )
+        for post in posts:
+            self.assertIn(post.text, message.body)
+        self.assertFalse(Notification.objects.filter(emailed=False).exists())
+        self.assertEqual(digests.send_digests(), 0)
+
+    def test_batch_without_pending_notifications(self):
+        """Пачка, которую уже разослали, не ломает рассылку."""
+        connection = mock.Mock()
+        self.assertEqual(
+            digests.send_batch([self.followers[0].pk], connection), 0,
+        )
+        connection.send_messages.assert_not_called()
+
+    def test_running_digest_is_not_doubled(self):
+        """Уведомление во время рассылки не ставит вторую, а ждет ее конца."""
+        digest_jobs = Job.objects.filter(task=digests.DIGEST_TASK)
+        digests.schedule()
+        digest_jobs.update(status=Job.RUNNING)
+        post = Post.objects.create(author=self.author, text='Пост')
+        notify_followers(post.pk)
+        digests.schedule()
+        self.assertEqual(digest_jobs.get().status, Job.RUNNING)
+
+        digests.schedule_leftovers()
+        self.assertEqual(digest_jobs.filter(status=Job.QUEUED).count(), 1)
+        digests.schedule_leftovers()
+        self.assertEqual(digest_jobs.count(), 2)
@@ -0,0 +1,41 @@
+"""Счетчик непрочитанных уведомлений в шапке сайта.
+
+Считается COUNT по частичному индексу, но не дальше UNREAD_LIMIT: в
+шапке все равно выводится «99+». Результат лежит в кэше под ключом
+пользователя и удаляется, когда ему приходят уведомления или он их
+читает; удаление поста с уведомлениями счетчик не сбрасывает, такое
+расхождение живет не дольше NOTIFICATIONS_UNREAD_TIMEOUT.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Notification
+
+UNREAD_LIMIT = 100
+
+
+def _key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def unread_count(user):
+    key = _key(user.pk)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(
+            recipient=user, is_read=False,
+        )[:UNREAD_LIMIT].count()
+        cache.set(key, count, settings.NOTIFICATIONS_UNREAD_TIMEOUT)
+    return count
+
+
+def forget(user_ids):
+    """Сбросить закэшированные счетчики этих пользователей."""
+    cache.delete_many([_key(user_id) for user_id in user_ids])
+
+
+def mark_read(user):
+    Notification.objects.filter(recipient=user, is_read=False).update(
+        is_read=True,
+    )
+    forget([user.pk])
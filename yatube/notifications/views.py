@@ -0,0 +1,29 @@
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import render
+
+from core.query_budget import query_budget
+from posts.paginators import CursorPaginator
+
+from .models import Notification
+from .unread import mark_read
+
+NOTIFICATIONS_AMOUNT = 20
+
+
+@login_required
+@query_budget(5)
+def index(request):
+    """Уведомления пользователя; открыв их, он их прочитал."""
+    template = 'notifications/index.html'
+    paginator = CursorPaginator(
+        Notification.objects.filter(
+            recipient=request.user,
+        ).select_related('post__author', 'post__group'),
+        NOTIFICATIONS_AMOUNT,
+        ordering=('-created', '-pk'),
+    )
+    page_obj = paginator.get_page(request.GET.get('cursor'))
+    # Страница уже выбрана, новые уведомления на ней останутся выделены.
+    if any(not notification.is_read for notification in page_obj):
+        mark_read(request.user)
+    return render(request, template, {'page_obj': page_obj})
@@ -0,0 +1,115 @@
+"""Постраничный вывод комментариев поста.
+
+Листаются курсором (CursorPaginator) только комментарии первого
+уровня, поэтому дальняя страница обсуждения стоит столько же, сколько
+первая. Ответы всех веток страницы догружаются одним запросом по
+индексу (root, path) уже в порядке обхода дерева, но не больше
+THREAD_REPLIES_AMOUNT на ветку: остальные листаются внутри ветки
+курсором по path через ту же точку подгрузки. Первая страница
+каждого порядка сортировки лежит в кэше под версией ленты
+feed_cache.comments(post_id); новый или удаленный комментарий
+увеличивает версию, и следующий запрос соберет страницу заново.
+"""
+from django.conf import settings
+
+from core.cache import get_or_recompute
+
+from . import feed_cache
+from .models import Comment
+from .paginators import CursorPage, CursorPaginator
+
+COMMENTS_AMOUNT = 20
+THREAD_REPLIES_AMOUNT = 5
+NEWEST = 'newest'
+OLDEST = 'oldest'
+ORDERINGS = {
+    NEWEST: ('-created', '-pk'),
+    OLDEST: ('created', 'pk'),
+}
+
+
+def comment_order(request):
+    order = request.GET.get('order')
+    return order if order in ORDERINGS else NEWEST
+
+
+def _paginator(post_id, order):
+    return CursorPaginator(
+        Comment.objects.filter(
+            post_id=post_id, parent__isnull=True,
+        ).select_related('author'),
+        COMMENTS_AMOUNT,
+        ordering=ORDERINGS[order],
+    )
+
+
+def _first_replies(root_ids):
+    """Первые ответы каждой ветки и по одному сверх лимита на ветку."""
+    table = Comment._meta.db_table
+    placeholders = ', '.join(['%s'] * len(root_ids))
+    # extra, а не pk__in=RawSQL: RawSQL в IN оборачивается во вторые
+    # скобки и становится скалярным подзапросом из одной строки.
+    return Comment.objects.extra(
+        where=[
+            f'{table}.id IN (SELECT id FROM (SELECT id, ROW_NUMBER() '
+            f'OVER (PARTITION BY root_id ORDER BY path) AS position '
+            f'FROM {table} WHERE root_id IN ({placeholders}) '
+            f'AND depth > 0) reply WHERE position <= %s)',
+        ],
+        params=[*root_ids, THREAD_REPLIES_AMOUNT + 1],
+    )
+
+
+def _split_replies(replies):
+    """Ответы для показа и path последнего, если за ним есть еще."""
+    shown = replies[:THREAD_REPLIES_AMOUNT]
+    more = len(replies) > THREAD_REPLIES_AMOUNT
+    return shown, shown[-1].path if more else None
+
+
+def attach_threads(comments):
+    """Разложить первые ответы по веткам в атрибут thread_replies.
+
+    В thread_next — курсор следующей порции ответов ветки или None.
+    """
+    roots = {comment.pk: comment for comment in comments}
+    threads = {root_id: [] for root_id in roots}
+    if roots:
+        replies = _first_replies(list(roots)).select_related(
+            'author',
+        ).order_by('root', 'path')
+        for reply in replies:
+            threads[reply.root_id].append(reply)
+    for root_id, replies in threads.items():
+        root = roots[root_id]
+        root.thread_replies, root.thread_next = _split_replies(replies)
+    return comments
+
+
+def thread_replies(post_id, root_id, after=''):
+    """Порция ответов ветки после ответа с путем after."""
+    replies = Comment.objects.filter(
+        post_id=post_id, root_id=root_id, depth__gt=0, path__gt=after,
+    ).select_related('author').order_by('path')
+    return _split_replies(list(replies[:THREAD_REPLIES_AMOUNT + 1]))
+
+
+def _first_page(post_id, order):
+    page = _paginator(post_id, order).page()
+    return attach_threads(list(page.object_list)), page.next_cursor
+
+
+def comments_page(post_id, order=NEWEST, cursor=None):
+    """Страница комментариев поста; первая берется из кэша."""
+    paginator = _paginator(post_id, order)
+    if cursor:
+        page = paginator.get_page(cursor)
+        attach_threads(page.object_list)
+        return page
+    version = feed_cache.feed_version(feed_cache.comments(post_id))
+    comments, next_cursor = get_or_recompute(
+        f'posts:comments:{post_id}:{order}:{version}',
+        lambda: _first_page(post_id, order),
+        settings.POSTS_FEED_CACHE_TIMEOUT,
+    )
+    return CursorPage(comments, paginator, next_cursor=next_cursor)
@@ -0,0 +1,177 @@
+"""Валидаторы условных GET-запросов для лент и постов.
+
+ETag строится из версий лент feed_cache: они меняются при любом
+изменении поста, комментария или группы, в том числе при правке и
+удалении, которые не видны по датам. Last-Modified — дата самого
+нового поста ленты, ее отдает один запрос по индексу с LIMIT 1;
+у страницы поста его нет: правку поста по датам не увидеть, и
+такая страница проверяется только по ETag. Ни один из валидаторов не
+требует рендеринга, поэтому 304 обходится в один-два запроса.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+
+from notifications.unread import unread_count
+
+from . import feed_cache
+from .models import Group, Post, User
+from .timeline import timeline_posts
+
+
+def make_etag(*parts):
+    raw = ':'.join(str(part) for part in parts)
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def latest_created(post_list):
+    """Дата самого нового поста ленты в ее собственной сортировке."""
+    # only, а не values_list: так работает и лента из UNION веток.
+    post = post_list.only('created').first()
+    return post.created if post else None
+
+
+def index_state(request):
+    return [feed_cache.INDEX], lambda: latest_created(Post.objects.all())
+
+
+def group_state(request, slug):
+    group_id = Group.objects.filter(slug=slug).values_list(
+        'pk', flat=True,
+    ).first()
+    if group_id is None:
+        return None
+    return [feed_cache.group(group_id)], lambda: latest_created(
+        Post.objects.filter(group_id=group_id)
+    )
+
+
+def profile_state(request, username):
+    author_id = User.objects.filter(username=username).values_list(
+        'pk', flat=True,
+    ).first()
+    if author_id is None:
+        return None
+    return [feed_cache.profile(author_id)], lambda: latest_created(
+        Post.objects.filter(author_id=author_id)
+    )
+
+
+def follow_state(request):
+    if not request.user.is_authenticated:
+        return None
+    feeds = [feed_cache.follow(request.user.pk), feed_cache.INDEX]
+    return feeds, lambda: latest_created(timeline_posts(request.user))
+
+
+def post_state(request, post_id):
+    post = Post.objects.filter(pk=post_id).values(
+        'author_id', 'group_id',
+    ).first()
+    if post is None:
+        return None
+    feeds = [
+        feed_cache.profile(post['author_id']),
+        feed_cache.comments(post_id),
+    ]
+    if post['group_id']:
+        feeds.append(feed_cache.group(post['group_id']))
+    return feeds, None
+
+
+def feeds_etag(request, feeds, etag_parts):
+    return make_etag(
+        *(part(request) if callable(part) else part for part in etag_parts),
+        feed_cache.feed_version(*feeds),
+        request.get_full_path(),
+    )
+
+
+def conditional_feed(state, *etag_parts):
+    """Декоратор condition() с валидаторами из функции состояния.
+
+    state(request, *args, **kwargs) возвращает ленты, от версий
+    которых зависит ответ, и функцию даты последнего изменения (None,
+    если дате у ресурса верить нельзя), либо None, если объекта нет —
+    тогда ответ отдает само представление.
+    etag_parts различают представления одного ресурса, например
+    HTML и JSON; вызываемые части получают request. Ленты ответа
+    остаются в request.etag_feeds, чтобы кэш страниц мог проверить
+    ETag, не вызывая представление.
+    """
+    def current(request, *args, **kwargs):
+        memo = request.__dict__.setdefault('_conditional_states', {})
+        if state not in memo:
+            memo[state] = state(request, *args, **kwargs)
+        return memo[state]
+
+    def etag(request, *args, **kwargs):
+        resource = current(request, *args, **kwargs)
+        if resource is None:
+            return None
+        feeds, _ = resource
+        request.etag_feeds = feeds
+        return feeds_etag(request, feeds, etag_parts)
+
+    def last_modified(request, *args, **kwargs):
+        resource = current(request, *args, **kwargs)
+        if resource is None:
+            return None
+        _, modified = resource
+        return modified() if modified else None
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
+
+
+def viewer(request):
+    """Часть ETag страницы, зависящая от посетителя.
+
+    В шапке выводятся имя пользователя и счетчик уведомлений, а в
+    формах — CSRF-токен, поэтому закэшированная браузером страница
+    годится, только пока не сменились пользователь, его CSRF-cookie
+    и число непрочитанных уведомлений.
+    """
+    if not request.user.is_authenticated:
+        return 'anonymous'
+    return make_etag(
+        request.user.pk,
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+        unread_count(request.user),
+    )
+
+
+PAGE_ETAG_PARTS = ('html', viewer)
+
+
+def page_etag(request, feeds):
+    """ETag, который conditional_page дал бы странице с этими лентами."""
+    return feeds_etag(request, feeds, PAGE_ETAG_PARTS)
+
+
+def conditional_page(state):
+    """conditional_feed для HTML-страниц с заголовками кэширования.
+
+    Страницы анонимов одинаковы и могут храниться в обратном прокси,
+    страницы пользователей — только в их браузере.
+    """
+    def decorator(view_func):
+        view = conditional_feed(state, *PAGE_ETAG_PARTS)(view_func)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = view(request, *args, **kwargs)
+            if request.user.is_authenticated:
+                patch_cache_control(response, private=True, max_age=0)
+            else:
+                patch_cache_control(
+                    response,
+                    public=True,
+                    max_age=settings.POSTS_PAGE_CACHE_MAX_AGE,
+                )
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,76 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Comment, Follow, Post, Profile, User
+
+
+def _change(queryset, field, delta):
+    value = F(field) + delta
+    if delta < 0:
+        value = Greatest(value, 0)
+    return queryset.update(**{field: value})
+
+
+def change_user_counter(user_id, field, delta):
+    """Изменить счетчик профиля одним UPDATE, создав профиль при нужде."""
+    profiles = Profile.objects.filter(user_id=user_id)
+    if _change(profiles, field, delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            Profile.objects.create(user_id=user_id)
+    except IntegrityError:
+        pass
+    _change(profiles, field, delta)
+
+
+def change_comments_counter(post_id, delta):
+    _change(Post.objects.filter(pk=post_id), 'comments_count', delta)
+
+
+def get_profile(user):
+    """Профиль пользователя; отсутствующий создается с пересчетом."""
+    try:
+        return user.profile
+    except Profile.DoesNotExist:
+        pass
+    profile, created = Profile.objects.get_or_create(user=user)
+    if created:
+        recount_profiles(Profile.objects.filter(pk=profile.pk))
+        profile.refresh_from_db()
+    return profile
+
+
+def _count(queryset, field):
+    return Coalesce(Subquery(
+        queryset.filter(**{field: OuterRef('user')})
+        .order_by().values(field)
+        .annotate(amount=Count('pk')).values('amount')
+    ), 0)
+
+
+def recount_profiles(profiles=None):
+    if profiles is None:
+        missing = User.objects.filter(profile__isnull=True)
+        Profile.objects.bulk_create(
+            (Profile(user_id=user_id) for user_id in
+             missing.values_list('pk', flat=True).iterator()),
+            ignore_conflicts=True,
+        )
+        profiles = Profile.objects.all()
+    return profiles.update(
+        posts_count=_count(Post.objects.all(), 'author'),
+        followers_count=_count(Follow.objects.all(), 'author'),
+        following_count=_count(Follow.objects.all(), 'user'),
+    )
+
+
+def recount_comments(posts=None):
+    if posts is None:
+        posts = Post.objects.all()
+    return posts.update(comments_count=Coalesce(Subquery(
+        Comment.objects.filter(post=OuterRef('pk'))
+        .order_by().values('post')
+        .annotate(amount=Count('pk')).values('amount')
+    ), 0))
@@ -0,0 +1,75 @@
+"""Поколения лент для версионированных ключей кэша фрагментов.
+
+Каждая лента (главная, группа, профиль, подписки) имеет счетчик
+поколения в кэше. Он входит в ключ фрагмента, поэтому изменение
+поста, комментария или группы мгновенно делает старые фрагменты
+недостижимыми, а таймаут кэша можно держать большим.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+INDEX = ('index',)
+
+
+def group(group_id):
+    return ('group', group_id)
+
+
+def profile(author_id):
+    return ('profile', author_id)
+
+
+def follow(user_id):
+    return ('follow', user_id)
+
+
+def comments(post_id):
+    return ('comments', post_id)
+
+
+def post_feeds(author_id, *group_ids):
+    """Ленты, в которых показывается пост автора из этих групп."""
+    return [INDEX, profile(author_id)] + [
+        group(group_id) for group_id in group_ids if group_id
+    ]
+
+
+def _key(feed):
+    return 'posts:feed-version:' + ':'.join(str(part) for part in feed)
+
+
+def _initial_version():
+    # Счетчик, вытесненный из кэша, не должен начаться заново с
+    # поколения, фрагменты которого еще могут лежать в кэше.
+    return int(time.time() * 1000)
+
+
+def feed_version(*feeds):
+    """Текущая версия для набора лент, например для подписок и главной."""
+    keys = [_key(feed) for feed in feeds]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _initial_version(), None)
+            versions[key] = cache.get(key)
+    return '.'.join(str(versions[key]) for key in keys)
+
+
+def bump(*feeds):
+    for feed in feeds:
+        if feed is None:
+            continue
+        key = _key(feed)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _initial_version(), None)
+
+
+def context(*feeds):
+    return {
+        'feed_version': feed_version(*feeds),
+        'feed_cache_timeout': settings.POSTS_FEED_CACHE_TIMEOUT,
+    }
@@ -1,6 +1,7 @@
 from django import forms
 from django.core.exceptions import ValidationError
 
+from .images import RejectedUpload, prepare_upload, validate_size
 from .models import Comment, Post
 
 MIN_TEXT_LENGTH = 8
@@ -13,6 +14,16 @@ class PostForm(forms.ModelForm):
             'text', 'group', 'image',
         )
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Недокачанный файл поле не открывает: ошибку дает clean_image.
+        self.rejected_image = self.files.get('image')
+        if isinstance(self.rejected_image, RejectedUpload):
+            self.files = self.files.copy()
+            del self.files['image']
+        else:
+            self.rejected_image = None
+
     def clean_text(self):
         text = self.cleaned_data['text']
         if len(text) < MIN_TEXT_LENGTH:
@@ -21,6 +32,11 @@ class PostForm(forms.ModelForm):
             )
         return text
 
+    def clean_image(self):
+        if self.rejected_image is not None:
+            validate_size(self.rejected_image)
+        return prepare_upload(self.cleaned_data['image'])
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
@@ -36,3 +52,19 @@ class CommentForm(forms.ModelForm):
                 'Комментарий слишком короткий'
             )
         return text
+
+
+class ReplyForm(CommentForm):
+    """Ответ на комментарий того же поста."""
+    class Meta(CommentForm.Meta):
+        fields = (
+            'text', 'parent',
+        )
+        widgets = {
+            'parent': forms.HiddenInput,
+        }
+
+    def __init__(self, *args, post, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['parent'].required = True
+        self.fields['parent'].queryset = Comment.objects.filter(post=post)
@@ -0,0 +1,142 @@
+"""Проверка и подготовка картинок, загружаемых к постам.
+
+Django уже пишет крупные загрузки во временный файл, а ImageField
+открывает картинку через Pillow только для чтения заголовка, поэтому
+размеры известны без декодирования пикселей. Здесь по ним отсекаются
+слишком тяжелые файлы и «бомбы» распаковки, а оригинал пересохраняется
+без EXIF и, если он слишком велик, уменьшается: JPEG декодируется
+сразу в уменьшенном масштабе (draft), так что в память не попадает
+полноразмерная картинка. Анимированные картинки сохраняются как есть:
+пересохранение оставило бы от них первый кадр.
+
+Представления формы поста (limit_image_upload) ставят первым
+обработчиком загрузки MaxSizeUploadHandler. Он перестает принимать
+файл, как только тот превысит POSTS_IMAGE_MAX_BYTES: остаток не
+пишется ни в память, ни на диск, а форма вместо файла получает
+RejectedUpload и отвечает той же ошибкой, что и validate_upload.
+Остальные загрузки сайта, например в админке, лимит не трогает.
+"""
+import os
+from functools import wraps
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile, UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from PIL import Image, ImageOps
+
+REENCODED_FORMATS = {
+    'JPEG': {'quality': 90, 'optimize': True},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 90},
+}
+
+
+def _megabytes(size):
+    return f'{size / 1024 / 1024:.0f} МБ'
+
+
+class RejectedUpload(UploadedFile):
+    """Файл, прием которого прерван на POSTS_IMAGE_MAX_BYTES.
+
+    Содержимого нет, size — сколько байт успело прийти.
+    """
+
+
+class MaxSizeUploadHandler(FileUploadHandler):
+    """Прервать прием файла больше POSTS_IMAGE_MAX_BYTES."""
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def too_large(self):
+        return self.received > settings.POSTS_IMAGE_MAX_BYTES
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received = start + len(raw_data)
+        # None не пускает кусок к следующим обработчикам.
+        return None if self.too_large() else raw_data
+
+    def file_complete(self, file_size):
+        if not self.too_large():
+            return None
+        return RejectedUpload(
+            BytesIO(), self.file_name, self.content_type, self.received,
+            self.charset, self.content_type_extra,
+        )
+
+
+def limit_image_upload(view_func):
+    """Подключить MaxSizeUploadHandler до чтения request.FILES.
+
+    CsrfViewMiddleware читает request.POST раньше представления, и
+    сменить обработчики было бы поздно, поэтому CSRF проверяется уже
+    внутри, после установки обработчика.
+    """
+    protected = csrf_protect(view_func)
+
+    @csrf_exempt
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        request.upload_handlers.insert(0, MaxSizeUploadHandler(request))
+        return protected(request, *args, **kwargs)
+    return wrapper
+
+
+def validate_size(upload):
+    if upload.size > settings.POSTS_IMAGE_MAX_BYTES:
+        raise ValidationError(
+            'Файл слишком большой: не больше '
+            f'{_megabytes(settings.POSTS_IMAGE_MAX_BYTES)}'
+        )
+
+
+def validate_upload(upload):
+    """Отклонить файл по размеру и числу пикселей из заголовка."""
+    validate_size(upload)
+    width, height = upload.image.size
+    frames = getattr(upload.image, 'n_frames', 1)
+    if width * height * frames > settings.POSTS_IMAGE_MAX_PIXELS:
+        raise ValidationError(
+            f'Картинка слишком большая: {width}x{height} пикселей'
+        )
+
+
+def _needs_reencode(image):
+    max_side = settings.POSTS_IMAGE_MAX_SIDE
+    return (
+        'exif' in image.info
+        or image.getexif()
+        or image.width > max_side
+        or image.height > max_side
+    )
+
+
+def prepare_upload(upload):
+    """Вернуть загрузку без EXIF и не больше POSTS_IMAGE_MAX_SIDE."""
+    if not isinstance(upload, UploadedFile):
+        return upload
+    validate_upload(upload)
+    upload.seek(0)
+    image = Image.open(upload)
+    image_format = image.format
+    if (
+        image_format not in REENCODED_FORMATS
+        or getattr(image, 'is_animated', False)
+        or not _needs_reencode(image)
+    ):
+        upload.seek(0)
+        return upload
+    max_side = settings.POSTS_IMAGE_MAX_SIDE
+    image.draft(image.mode, (max_side, max_side))
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail((max_side, max_side), Image.LANCZOS)
+    output = BytesIO()
+    image.save(output, image_format, **REENCODED_FORMATS[image_format])
+    name = os.path.basename(upload.name)
+    return SimpleUploadedFile(
+        name, output.getvalue(), content_type=upload.content_type,
+    )
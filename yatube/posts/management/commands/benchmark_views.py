@@ -0,0 +1,237 @@
+import json
+import os
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_databases, teardown_databases
+from django.urls import reverse
+
+from core.query_budget import QueryCounter
+from posts.models import Comment, Follow, Group, Post, User
+
+VIEWS = (
+    'index',
+    'group_posts',
+    'profile',
+    'post_detail',
+    'follow_index',
+    'post_create',
+)
+OK_STATUSES = (200, 302, 304)
+
+
+def percentile(values, fraction):
+    """Перцентиль по ближайшему рангу."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def seed(users, groups, posts, comments, follows, rng):
+    """Наполнить базу через mixer, с сигналами, как это делают формы."""
+    from mixer.backend.django import mixer
+
+    authors = mixer.cycle(users).blend(User)
+    group_list = mixer.cycle(groups).blend(Group)
+    post_list = [
+        mixer.blend(
+            Post,
+            author=rng.choice(authors),
+            group=rng.choice(group_list) if group_list else None,
+            image='',
+        )
+        for _ in range(posts)
+    ]
+    if post_list:
+        for _ in range(comments):
+            mixer.blend(
+                Comment,
+                post=rng.choice(post_list),
+                author=rng.choice(authors),
+                parent=None,
+                root=None,
+                path='',
+                depth=0,
+            )
+    pairs = set()
+    while len(pairs) < min(follows, users * (users - 1)):
+        user, author = rng.sample(authors, 2)
+        pairs.add((user.pk, author.pk))
+    for user_id, author_id in pairs:
+        Follow.objects.create(user_id=user_id, author_id=author_id)
+
+
+class ViewBenchmark:
+    """Запросы к одному представлению через полный стек middleware."""
+
+    def __init__(self, name, client, url, method='get', data=None):
+        self.name = name
+        self.client = client
+        self.url = url
+        self.method = method
+        self.data = data
+
+    def request(self):
+        url = self.url() if callable(self.url) else self.url
+        data = self.data() if callable(self.data) else self.data
+        with QueryCounter() as counter:
+            start = time.perf_counter()
+            response = getattr(self.client, self.method)(url, data)
+            elapsed = time.perf_counter() - start
+        if response.status_code not in OK_STATUSES:
+            raise CommandError(
+                f'{self.name}: {url} ответил {response.status_code}'
+            )
+        return elapsed, counter.count
+
+    def run(self, requests, warmup):
+        for _ in range(warmup):
+            self.request()
+        latencies, queries = [], []
+        for _ in range(requests):
+            elapsed, count = self.request()
+            latencies.append(elapsed)
+            queries.append(count)
+        total = sum(latencies)
+        return {
+            'requests': requests,
+            'requests_per_second': round(requests / total, 1),
+            'p50_ms': round(percentile(latencies, 0.5) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+            'queries_per_request': round(sum(queries) / requests, 2),
+        }
+
+
+class Command(BaseCommand):
+    help = (
+        'Наполняет базу и замеряет запросы в секунду, задержки p50/p99 '
+        'и SQL-запросы на запрос для публичных представлений. Отчет в '
+        'JSON можно сравнивать между коммитами.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--groups', type=int, default=5)
+        parser.add_argument('--posts', type=int, default=500)
+        parser.add_argument('--comments', type=int, default=1000)
+        parser.add_argument('--follows', type=int, default=200)
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--views',
+            nargs='+',
+            choices=VIEWS,
+            default=list(VIEWS),
+        )
+        parser.add_argument(
+            '--current-db',
+            action='store_true',
+            help='Замерять на настроенной базе, не создавая тестовую. '
+                 'Объемы наполнения добавляются к уже имеющимся данным.',
+        )
+        parser.add_argument('--output', help='Файл для отчета JSON.')
+
+    def handle(self, *args, **options):
+        old_config = None
+        if not options['current_db']:
+            old_config = setup_databases(
+                verbosity=0, interactive=False, keepdb=False,
+            )
+        try:
+            report = self.benchmark(options)
+        finally:
+            if old_config is not None:
+                teardown_databases(old_config, verbosity=0)
+        text = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(text)
+            for name, result in report['views'].items():
+                self.stdout.write(
+                    f'{name:14} {result["requests_per_second"]:>9} rps '
+                    f'p50 {result["p50_ms"]:>8} ms '
+                    f'p99 {result["p99_ms"]:>8} ms '
+                    f'{result["queries_per_request"]:>6} queries'
+                )
+        else:
+            self.stdout.write(text)
+
+    def benchmark(self, options):
+        rng = random.Random(options['seed'])
+        volumes = {
+            name: options[name]
+            for name in ('users', 'groups', 'posts', 'comments', 'follows')
+        }
+        seed(rng=rng, **volumes)
+
+        posts = list(Post.objects.values_list('pk', 'author__username'))
+        groups = list(Group.objects.values_list('slug', flat=True))
+        follower = User.objects.filter(follower__isnull=False).first()
+        if not posts or not groups or follower is None:
+            raise CommandError('Нужны хотя бы один пост, группа и подписка.')
+        anonymous = Client()
+        user = Client()
+        user.force_login(follower)
+
+        benchmarks = {
+            'index': ViewBenchmark(
+                'index', anonymous, reverse('posts:index'),
+            ),
+            'group_posts': ViewBenchmark(
+                'group_posts', anonymous, lambda: reverse(
+                    'posts:group_posts', args=(rng.choice(groups),),
+                ),
+            ),
+            'profile': ViewBenchmark(
+                'profile', anonymous, lambda: reverse(
+                    'posts:profile', args=(rng.choice(posts)[1],),
+                ),
+            ),
+            'post_detail': ViewBenchmark(
+                'post_detail', anonymous, lambda: reverse(
+                    'posts:post_detail', args=(rng.choice(posts)[0],),
+                ),
+            ),
+            'follow_index': ViewBenchmark(
+                'follow_index', user, reverse('posts:follow_index'),
+            ),
+            'post_create': ViewBenchmark(
+                'post_create', user, reverse('posts:post_create'),
+                method='post',
+                data=lambda: {'text': f'Пост {rng.random()}'},
+            ),
+        }
+        return {
+            'commit': git_commit(),
+            'created': datetime.now(timezone.utc).isoformat(),
+            'environment': os.environ.get('YATUBE_ENV', 'dev'),
+            'debug': settings.DEBUG,
+            'database': connection.vendor,
+            'volumes': volumes,
+            'views': {
+                name: benchmarks[name].run(
+                    options['requests'], options['warmup'],
+                )
+                for name in options['views']
+            },
+        }
@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from posts.models import Follow, Group, Post, User
+from posts.timeline import timeline_posts
+from posts.views import POSTS_AMOUNT
+
+
+def feed_queries(author, group, post, follower):
+    """Запросы, которые выполняют представления лент на первой странице."""
+    queries = {
+        'index': Post.objects.all()[:POSTS_AMOUNT],
+    }
+    if group is not None:
+        queries['group_posts'] = group.posts.all()[:POSTS_AMOUNT]
+    if author is not None:
+        queries['profile'] = author.posts.all()[:POSTS_AMOUNT]
+        queries['profile following'] = Follow.objects.filter(
+            user=author, author=author,
+        )
+    if post is not None:
+        queries['post_detail comments'] = post.comments.all()
+    if follower is not None:
+        queries['follow_index'] = timeline_posts(follower)[:POSTS_AMOUNT]
+    return queries
+
+
+def full_scans(plan):
+    """Строки плана SQLite, в которых таблица читается целиком."""
+    return [
+        line for line in plan.splitlines()
+        if 'SCAN' in line and 'USING' not in line
+        or 'TEMP B-TREE' in line
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Печатает планы выполнения запросов для каждой ленты.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Завершиться с ошибкой, если запрос читает таблицу целиком '
+                 'или сортирует без индекса (только SQLite).',
+        )
+
+    def handle(self, *args, **options):
+        post = Post.objects.first()
+        follow = Follow.objects.first()
+        queries = feed_queries(
+            author=post.author if post else User.objects.first(),
+            group=Group.objects.first(),
+            post=post,
+            follower=follow.user if follow else None,
+        )
+        problems = []
+        for name, queryset in queries.items():
+            plan = queryset.explain()
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(plan)
+            self.stdout.write('')
+            if connection.vendor == 'sqlite':
+                problems.extend(
+                    f'{name}: {line.strip()}' for line in full_scans(plan)
+                )
+        if options['check'] and problems:
+            raise CommandError(
+                'Запросы лент не используют индексы:\n' + '\n'.join(problems)
+            )
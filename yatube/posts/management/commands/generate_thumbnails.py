@@ -0,0 +1,66 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from posts import thumbnails
+from posts.models import Post
+
+BATCH_SIZE = 100
+
+logger = logging.getLogger('yatube.thumbnails')
+
+
+class Command(BaseCommand):
+    help = 'Генерирует миниатюры картинок постов, ожидающих их.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Перегенерировать миниатюры всех постов с картинками.',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а ждать новые посты.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Пауза между проверками в режиме --loop, секунд.',
+        )
+
+    def handle(self, *args, **options):
+        if options['all']:
+            Post.objects.exclude(image='').update(thumbnail_pending=True)
+        while True:
+            done = self.process_pending()
+            if done:
+                self.stdout.write(f'Сделано миниатюр: {done}')
+            if not options['loop']:
+                break
+            close_old_connections()
+            if not done:
+                time.sleep(options['interval'])
+
+    def process_pending(self):
+        done = 0
+        failed = set()
+        while True:
+            batch = list(
+                thumbnails.pending_posts().exclude(pk__in=failed)[:BATCH_SIZE]
+            )
+            if not batch:
+                return done
+            for post in batch:
+                try:
+                    thumbnails.generate(post)
+                except Exception:
+                    # Пост остается ожидающим до следующего запуска.
+                    logger.exception('Миниатюра поста %s не сделана', post.pk)
+                    failed.add(post.pk)
+                else:
+                    done += 1
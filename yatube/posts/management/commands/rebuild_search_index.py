@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from posts.search import get_backend
+
+
+class Command(BaseCommand):
+    help = (
+        'Заново строит поисковый индекс постов, например после смены '
+        'POSTS_SEARCH_BACKEND или массовой загрузки данных.'
+    )
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Поисковый индекс ({backend.name}) перестроен'
+        ))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import recount_comments, recount_profiles
+from posts.timeline import pause_popular_authors
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает счетчики постов, подписчиков, подписок '
+        'и комментариев по данным в базе.'
+    )
+
+    def handle(self, *args, **options):
+        profiles = recount_profiles()
+        pause_popular_authors()
+        posts = recount_comments()
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано профилей: {profiles}, постов: {posts}'
+        ))
@@ -0,0 +1,340 @@
+import multiprocessing
+import random
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from posts import feed_cache
+from posts.counters import recount_comments, recount_profiles
+from posts.models import (
+    Comment, Follow, Group, Post, User, comment_path_segment,
+)
+from posts.search import get_backend
+from posts.timeline import backfill_all, pause_popular_authors
+
+SENTENCES = 1000
+
+_plan = None
+_write_lock = None
+
+
+def power_law_index(rng, size, exponent):
+    """Случайный индекс от 0 до size - 1 с убывающей вероятностью.
+
+    Вероятность индекса k пропорциональна (k + 1) ** -exponent; при
+    exponent = 0 распределение равномерное.
+    """
+    u = rng.random()
+    if exponent == 1:
+        rank = (size + 1) ** u
+    else:
+        power = 1 - exponent
+        rank = (((size + 1) ** power - 1) * u + 1) ** (1 / power)
+    return min(int(rank) - 1, size - 1)
+
+
+def next_pk(model):
+    return (model.objects.aggregate(Max('pk'))['pk__max'] or 0) + 1
+
+
+def bulk_insert(model, objects, batch_size):
+    fields = model._meta.concrete_fields
+    limit = connection.ops.bulk_batch_size(fields, objects)
+    # SQLite пишет в один поток: процессы готовят строки параллельно,
+    # а вставляют по очереди, иначе ловят «database is locked».
+    with _write_lock or nullcontext(), transaction.atomic():
+        model.objects.bulk_create(objects, batch_size=min(batch_size, limit))
+
+
+@contextmanager
+def explicit_created(*models):
+    """Не подменять created текущим временем при bulk_create."""
+    fields = [model._meta.get_field('created') for model in models]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def _post_created(plan, index):
+    return plan['end'] - timedelta(
+        seconds=(plan['posts'] - index) * plan['step'],
+    )
+
+
+def _text(rng, plan, sentences=1):
+    return ' '.join(rng.choices(plan['sentences'], k=sentences))
+
+
+def insert_posts(plan, start, stop):
+    rng = random.Random(f'{plan["seed"]}-posts-{start}')
+    posts = []
+    for index in range(start, stop):
+        group = rng.randrange(plan['groups'] + 1)
+        posts.append(Post(
+            pk=plan['post_base'] + index,
+            text=_text(rng, plan, rng.randint(1, 5)),
+            author_id=plan['user_base'] + power_law_index(
+                rng, plan['users'], plan['post_exponent'],
+            ),
+            group_id=plan['group_base'] + group - 1 if group else None,
+            created=_post_created(plan, index),
+        ))
+    bulk_insert(Post, posts, plan['batch_size'])
+    return stop - start
+
+
+def insert_comments(plan, start, stop):
+    rng = random.Random(f'{plan["seed"]}-comments-{start}')
+    comments = []
+    for index in range(start, stop):
+        # Чаще комментируют свежие посты.
+        post = plan['posts'] - 1 - power_law_index(
+            rng, plan['posts'], plan['comment_exponent'],
+        )
+        age = (plan['posts'] - post) * plan['step']
+        pk = plan['comment_base'] + index
+        comments.append(Comment(
+            pk=pk,
+            root_id=pk,
+            path=comment_path_segment(pk),
+            post_id=plan['post_base'] + post,
+            author_id=plan['user_base'] + rng.randrange(plan['users']),
+            text=_text(rng, plan),
+            created=_post_created(plan, post) + timedelta(
+                seconds=rng.random() * age,
+            ),
+        ))
+    bulk_insert(Comment, comments, plan['batch_size'])
+    return stop - start
+
+
+TASKS = {'posts': insert_posts, 'comments': insert_comments}
+
+
+def _init_worker(plan, write_lock):
+    global _plan, _write_lock
+    _plan = plan
+    _write_lock = write_lock
+
+
+def _run_task(task):
+    name, start, stop = task
+    try:
+        return TASKS[name](_plan, start, stop)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстро наполняет базу пользователями, группами, постами, '
+        'комментариями и подписками через bulk_create, минуя сигналы, '
+        'а затем одним проходом пересчитывает счетчики, ленты подписок '
+        'и поисковый индекс. Число постов у автора, подписчиков у автора '
+        'и комментариев у поста подчиняется степенному закону.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--comments', type=int, default=200000)
+        parser.add_argument('--follows', type=int, default=20000)
+        parser.add_argument(
+            '--post-exponent', type=float, default=1.2,
+            help='Показатель степенного закона постов на автора.',
+        )
+        parser.add_argument(
+            '--follower-exponent', type=float, default=1.1,
+            help='Показатель степенного закона подписчиков на автора.',
+        )
+        parser.add_argument(
+            '--comment-exponent', type=float, default=1.0,
+            help='Показатель степенного закона комментариев на пост.',
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько последних дней распределить посты.',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Число процессов, вставляющих посты и комментарии.',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--chunk-size', type=int, default=50000,
+            help='Сколько строк вставляет одна задача в одной транзакции.',
+        )
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--locale', default='ru_RU')
+        parser.add_argument(
+            '--no-search',
+            action='store_true',
+            help='Не перестраивать поисковый индекс.',
+        )
+
+    def handle(self, *args, **options):
+        if options['users'] < 2:
+            raise CommandError('Нужно хотя бы два пользователя.')
+        if options['workers'] > 1 and (
+            connection.vendor == 'sqlite' and connection.is_in_memory_db()
+        ):
+            raise CommandError(
+                'Процессы не видят базу SQLite в памяти, '
+                'запустите с --workers 1.'
+            )
+        self.started = time.perf_counter()
+        rng = random.Random(options['seed'])
+        plan = self.make_plan(options)
+
+        self.create_users(plan)
+        self.create_groups(plan)
+        with explicit_created(Post, Comment):
+            self.run_tasks('posts', plan, options)
+            self.run_tasks('comments', plan, options)
+        follow_base = self.create_follows(plan, options, rng)
+        self.reset_sequences()
+        self.rebuild_derived(plan, follow_base, options)
+
+    def progress(self, message):
+        elapsed = time.perf_counter() - self.started
+        self.stdout.write(f'[{elapsed:8.1f} с] {message}')
+
+    def make_plan(self, options):
+        from faker import Faker
+
+        faker = Faker(options['locale'])
+        faker.seed_instance(options['seed'])
+        posts = options['posts']
+        if not posts:
+            options['comments'] = 0
+        return {
+            'seed': options['seed'],
+            'sentences': [faker.sentence() for _ in range(SENTENCES)],
+            'words': [faker.word() for _ in range(SENTENCES)],
+            'users': options['users'],
+            'groups': options['groups'],
+            'posts': posts,
+            'comments': options['comments'],
+            'user_base': next_pk(User),
+            'group_base': next_pk(Group),
+            'post_base': next_pk(Post),
+            'comment_base': next_pk(Comment),
+            'post_exponent': options['post_exponent'],
+            'comment_exponent': options['comment_exponent'],
+            'end': timezone.now(),
+            'step': options['days'] * 24 * 3600 / max(posts, 1),
+            'batch_size': options['batch_size'],
+        }
+
+    def create_users(self, plan):
+        # Хеш один на всех: make_password на каждого занял бы минуты.
+        password = make_password(None)
+        bulk_insert(User, [
+            User(
+                pk=plan['user_base'] + index,
+                username=f'seed{plan["user_base"] + index}',
+                password=password,
+            )
+            for index in range(plan['users'])
+        ], plan['batch_size'])
+        self.progress(f'Пользователей: {plan["users"]}')
+
+    def create_groups(self, plan):
+        rng = random.Random(f'{plan["seed"]}-groups')
+        bulk_insert(Group, [
+            Group(
+                pk=plan['group_base'] + index,
+                title=' '.join(rng.sample(plan['words'], 2)).capitalize(),
+                slug=f'seed-{plan["group_base"] + index}',
+                description=_text(rng, plan, 2),
+            )
+            for index in range(plan['groups'])
+        ], plan['batch_size'])
+        self.progress(f'Групп: {plan["groups"]}')
+
+    def run_tasks(self, name, plan, options):
+        total = plan[name]
+        size = options['chunk_size']
+        tasks = [
+            (name, start, min(start + size, total))
+            for start in range(0, total, size)
+        ]
+        if options['workers'] > 1:
+            # Дочерние процессы не должны делить открытые соединения.
+            connections.close_all()
+            write_lock = None
+            if connection.vendor == 'sqlite':
+                write_lock = multiprocessing.Lock()
+            with multiprocessing.Pool(
+                options['workers'], _init_worker, (plan, write_lock),
+            ) as pool:
+                for _ in pool.imap_unordered(_run_task, tasks):
+                    pass
+        else:
+            for _, start, stop in tasks:
+                TASKS[name](plan, start, stop)
+        self.progress(f'{name}: {total}')
+
+    def create_follows(self, plan, options, rng):
+        users = plan['users']
+        wanted = min(options['follows'], users * (users - 1))
+        # Популярность не связана с плодовитостью: иначе у самых
+        # читаемых авторов были бы и почти все посты.
+        popularity = list(range(users))
+        rng.shuffle(popularity)
+        pairs = set()
+        attempts = 0
+        while len(pairs) < wanted and attempts < wanted * 20:
+            attempts += 1
+            user = rng.randrange(users)
+            author = popularity[power_law_index(
+                rng, users, options['follower_exponent'],
+            )]
+            if user != author:
+                pairs.add((user, author))
+        base = next_pk(Follow)
+        bulk_insert(Follow, [
+            Follow(
+                pk=base + index,
+                user_id=plan['user_base'] + user,
+                author_id=plan['user_base'] + author,
+            )
+            for index, (user, author) in enumerate(sorted(pairs))
+        ], plan['batch_size'])
+        self.progress(f'Подписок: {len(pairs)}')
+        return base
+
+    def reset_sequences(self):
+        # Ключи заданы явно, последовательности PostgreSQL надо сдвинуть.
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), [User, Group, Post, Comment, Follow],
+        )
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+    def rebuild_derived(self, plan, follow_base, options):
+        recount_profiles()
+        pause_popular_authors()
+        recount_comments(Post.objects.filter(pk__gte=plan['post_base']))
+        self.progress('Счетчики пересчитаны')
+        entries = backfill_all(follow_base)
+        self.progress(f'Записей в лентах подписок: {entries}')
+        if not options['no_search']:
+            backend = get_backend()
+            backend.rebuild()
+            self.progress(f'Поисковый индекс ({backend.name}) перестроен')
+        feed_cache.bump(feed_cache.INDEX)
+        self.stdout.write(self.style.SUCCESS('Готово'))
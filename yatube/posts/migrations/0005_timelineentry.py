@@ -0,0 +1,59 @@
+# Generated by Django 2.2.16 on 2026-10-17 04:48
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+def fill_timelines(apps, schema_editor):
+    """Одним INSERT ... SELECT, как timeline.backfill_all на этот момент.
+
+    Авторов, у которых подписчиков больше POSTS_TIMELINE_FANOUT_LIMIT,
+    лента читает без раскладки, их посты не копируются.
+    """
+    Follow = apps.get_model('posts', 'Follow')
+    Post = apps.get_model('posts', 'Post')
+    TimelineEntry = apps.get_model('posts', 'TimelineEntry')
+    ops = schema_editor.connection.ops
+    follows = Follow._meta.db_table
+    schema_editor.execute(
+        f'{ops.insert_statement(ignore_conflicts=True)} '
+        f'{TimelineEntry._meta.db_table} (user_id, post_id) '
+        f'SELECT follow.user_id, post.id FROM {follows} follow '
+        f'JOIN (SELECT author_id FROM {follows} GROUP BY author_id '
+        f'HAVING COUNT(*) <= %s) fanned '
+        f'ON fanned.author_id = follow.author_id '
+        f'JOIN (SELECT id, author_id, ROW_NUMBER() OVER ('
+        f'PARTITION BY author_id ORDER BY created DESC, id DESC) AS position '
+        f'FROM {Post._meta.db_table}) post '
+        f'ON post.author_id = follow.author_id '
+        f'WHERE post.position <= %s '
+        f'{ops.ignore_conflicts_suffix_sql(ignore_conflicts=True)}',
+        [
+            settings.POSTS_TIMELINE_FANOUT_LIMIT,
+            settings.POSTS_TIMELINE_BACKFILL,
+        ],
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0004_follow'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to='posts.Post')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='timelineentry',
+            constraint=models.UniqueConstraint(fields=('user', 'post'), name='unique_timeline_entry'),
+        ),
+        migrations.RunPython(fill_timelines, migrations.RunPython.noop),
+    ]
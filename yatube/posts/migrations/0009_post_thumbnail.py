@@ -0,0 +1,35 @@
+# Generated by Django 2.2.16 on 2026-10-17 04:58
+
+from django.db import migrations, models
+
+
+def mark_thumbnails_pending(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Post.objects.exclude(image='').update(thumbnail_pending=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='thumbnail',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='Миниатюра'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='thumbnail_pending',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Миниатюра ожидает генерации'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(thumbnail_pending=True), fields=['id'], name='post_thumbnail_pending_idx'),
+        ),
+        migrations.RunPython(
+            mark_thumbnails_pending, migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 2.2.16 on 2026-10-17 04:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_post_thumbnail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='thumbnail_avif_srcset',
+            field=models.TextField(blank=True, editable=False, verbose_name='Варианты миниатюры AVIF'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='thumbnail_srcset',
+            field=models.TextField(blank=True, editable=False, verbose_name='Варианты миниатюры JPEG'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='thumbnail_webp_srcset',
+            field=models.TextField(blank=True, editable=False, verbose_name='Варианты миниатюры WebP'),
+        ),
+    ]
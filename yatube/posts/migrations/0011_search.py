@@ -0,0 +1,93 @@
+# Generated by Django 2.2.16 on 2026-10-17 05:03
+
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Копия логики posts.search на момент миграции: живой модуль может
+# измениться, а миграция должна делать то же, что и раньше.
+FTS_TABLE = 'posts_post_fts'
+TERM_MAX_LENGTH = 64
+BATCH_SIZE = 1000
+WORD_RE = re.compile(r'\w+')
+
+
+def normalize(text):
+    return text.replace('ё', 'е').replace('Ё', 'Е')
+
+
+def term_weights(text):
+    return Counter(
+        word for word in WORD_RE.findall(normalize(text).lower())
+        if len(word) <= TERM_MAX_LENGTH
+    )
+
+
+def fts5_available(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return ('ENABLE_FTS5',) in cursor.fetchall()
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    has_fts5 = fts5_available(connection)
+    if has_fts5:
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5('
+            f'text, tokenize="unicode61 remove_diacritics 2")'
+        )
+    backend = settings.POSTS_SEARCH_BACKEND
+    if backend == 'fts5' or backend == 'auto' and has_fts5:
+        schema_editor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, text) '
+            f"SELECT id, REPLACE(REPLACE(text, 'ё', 'е'), 'Ё', 'Е') "
+            f'FROM posts_post'
+        )
+        return
+    Post = apps.get_model('posts', 'Post')
+    SearchTerm = apps.get_model('posts', 'SearchTerm')
+    batch = []
+    posts = Post.objects.order_by().values_list('pk', 'text')
+    for post_id, text in posts.iterator():
+        batch.extend(
+            SearchTerm(post_id=post_id, term=term, weight=weight)
+            for term, weight in term_weights(text).items()
+        )
+        if len(batch) >= BATCH_SIZE:
+            SearchTerm.objects.bulk_create(batch)
+            batch = []
+    SearchTerm.objects.bulk_create(batch)
+
+
+def drop_search_index(apps, schema_editor):
+    schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_thumbnail_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, verbose_name='Слово')),
+                ('weight', models.PositiveIntegerField(default=1, verbose_name='Число вхождений')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='posts.Post')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='searchterm',
+            constraint=models.UniqueConstraint(fields=('term', 'post'), name='unique_search_term'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
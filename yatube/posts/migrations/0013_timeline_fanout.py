@@ -0,0 +1,31 @@
+# Generated by Django 2.2.16 on 2026-10-17 06:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def pause_popular_authors(apps, schema_editor):
+    # Раньше режим решался при чтении по числу подписчиков; посты
+    # популярных авторов и так не разложены.
+    Profile = apps.get_model('posts', 'Profile')
+    Profile.objects.filter(
+        followers_count__gt=settings.POSTS_TIMELINE_FANOUT_LIMIT,
+    ).update(timeline_fanned_out=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_comment_threads'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='timeline_fanned_out',
+            field=models.BooleanField(default=True, verbose_name='Посты раскладываются по лентам подписчиков'),
+        ),
+        migrations.RunPython(
+            pause_popular_authors, migrations.RunPython.noop,
+        ),
+    ]
@@ -5,6 +5,41 @@ from django.db.models.deletion import SET_NULL
 
 User = get_user_model()
 POST_MAX_LENGTH_NAME = 15
+# Ответы глубже этого уровня становятся соседями своего родителя.
+COMMENT_MAX_DEPTH = 8
+COMMENT_PATH_STEP = 10
+
+
+def comment_path_segment(comment_id):
+    """Часть пути комментария; строки путей сортируются как деревья."""
+    return f'{comment_id:0{COMMENT_PATH_STEP}d}'
+
+
+class Profile(models.Model):
+    """Счетчики пользователя, которые иначе пришлось бы считать COUNT."""
+    objects = models.Manager()
+    user = models.OneToOneField(
+        User,
+        on_delete=CASCADE,
+        related_name='profile',
+        verbose_name='Пользователь',
+    )
+    posts_count = models.PositiveIntegerField('Количество постов', default=0)
+    followers_count = models.PositiveIntegerField(
+        'Количество подписчиков',
+        default=0,
+    )
+    following_count = models.PositiveIntegerField(
+        'Количество подписок',
+        default=0,
+    )
+    timeline_fanned_out = models.BooleanField(
+        'Посты раскладываются по лентам подписчиков',
+        default=True,
+    )
+
+    def __str__(self):
+        return str(self.user)
 
 
 class Group(models.Model):
@@ -43,10 +78,57 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True,
     )
+    thumbnail = models.CharField(
+        'Миниатюра',
+        max_length=255,
+        blank=True,
+        editable=False,
+    )
+    thumbnail_srcset = models.TextField(
+        'Варианты миниатюры JPEG',
+        blank=True,
+        editable=False,
+    )
+    thumbnail_webp_srcset = models.TextField(
+        'Варианты миниатюры WebP',
+        blank=True,
+        editable=False,
+    )
+    thumbnail_avif_srcset = models.TextField(
+        'Варианты миниатюры AVIF',
+        blank=True,
+        editable=False,
+    )
+    thumbnail_pending = models.BooleanField(
+        'Миниатюра ожидает генерации',
+        default=False,
+        editable=False,
+    )
     created = models.DateTimeField('Дата создания', auto_now_add=True)
+    comments_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+    )
 
     class Meta:
         ordering = ['-created']
+        indexes = [
+            models.Index(fields=['-created', '-id'], name='post_created_idx'),
+            models.Index(
+                fields=['author', '-created', '-id'],
+                name='post_author_created_idx',
+            ),
+            models.Index(
+                fields=['group', '-created', '-id'],
+                name='post_group_created_idx',
+            ),
+            models.Index(
+                fields=['id'],
+                condition=models.Q(thumbnail_pending=True),
+                name='post_thumbnail_pending_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.text[:POST_MAX_LENGTH_NAME]
@@ -69,9 +151,76 @@ class Comment(models.Model):
         help_text='Поделитесь своей мыслью',
     )
     created = models.DateTimeField('Дата создания', auto_now_add=True)
+    parent = models.ForeignKey(
+        'self',
+        on_delete=CASCADE,
+        null=True,
+        blank=True,
+        related_name='replies',
+        verbose_name='Ответ на',
+    )
+    root = models.ForeignKey(
+        'self',
+        on_delete=CASCADE,
+        null=True,
+        editable=False,
+        related_name='thread',
+        verbose_name='Первый комментарий ветки',
+    )
+    path = models.CharField(
+        'Путь в дереве',
+        max_length=(COMMENT_MAX_DEPTH + 1) * COMMENT_PATH_STEP,
+        default='',
+        editable=False,
+    )
+    depth = models.PositiveSmallIntegerField(
+        'Уровень вложенности',
+        default=0,
+        editable=False,
+    )
 
     class Meta:
         ordering = ['-created']
+        indexes = [
+            models.Index(
+                fields=['post', '-created', '-id'],
+                name='comment_post_created_idx',
+            ),
+            models.Index(
+                fields=['post', '-created', '-id'],
+                condition=models.Q(parent__isnull=True),
+                name='comment_top_created_idx',
+            ),
+            models.Index(
+                fields=['root', 'path'],
+                name='comment_thread_path_idx',
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.pk is None and self.parent_id:
+            if self.parent.depth >= COMMENT_MAX_DEPTH:
+                self.parent = self.parent.parent
+            self.root_id = self.parent.root_id
+            self.depth = self.parent.depth + 1
+        super().save(*args, **kwargs)
+
+    def finish_path(self):
+        """Дописать путь после INSERT: он включает собственный id."""
+        self.path = comment_path_segment(self.pk)
+        if self.parent_id:
+            self.path = self.parent.path + self.path
+        else:
+            self.root_id = self.pk
+        Comment.objects.filter(pk=self.pk).update(
+            path=self.path, root=self.root_id,
+        )
+
+    def subtree(self):
+        """Комментарий и все ответы на него в порядке обхода дерева."""
+        return Comment.objects.filter(
+            root_id=self.root_id, path__startswith=self.path,
+        ).order_by('path')
 
 
 class Follow(models.Model):
@@ -86,3 +235,61 @@ class Follow(models.Model):
         on_delete=models.CASCADE,
         related_name='following',
     )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'],
+                name='unique_follow',
+            ),
+        ]
+
+
+class TimelineEntry(models.Model):
+    """Запись ленты подписок, разложенная подписчику при публикации."""
+    objects = models.Manager()
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+    )
+    created = models.DateTimeField('Дата создания поста')
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', '-created', '-post'],
+                name='timeline_user_created_idx',
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'],
+                name='unique_timeline_entry',
+            ),
+        ]
+
+
+class SearchTerm(models.Model):
+    """Слово поста в обратном индексе поиска."""
+    objects = models.Manager()
+    term = models.CharField('Слово', max_length=64)
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='search_terms',
+    )
+    weight = models.PositiveIntegerField('Число вхождений', default=1)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['term', 'post'],
+                name='unique_search_term',
+            ),
+        ]
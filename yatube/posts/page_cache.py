@@ -0,0 +1,113 @@
+"""Кэш целых страниц лент и постов для анонимных посетителей.
+
+Анонимам все страницы показываются одинаково, поэтому готовый ответ
+можно отдать, не вызывая представление и не трогая базу. Запись кэша
+хранит ленты страницы и ее ETag; на попадании ETag считается заново
+по текущим версиям лент (это только чтения кэша), и если он
+изменился, страница рендерится заново. Так кэш устаревает ровно тогда
+же, когда conditional_page перестает отвечать 304.
+
+Единственная личная часть страницы анонима — CSRF-токен в формах. Он
+хранится в кэше как метка и подставляется при выдаче, как в
+edge-side include.
+"""
+import copy
+import hashlib
+import re
+from http import HTTPStatus
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+from .conditional import page_etag
+
+KEY_PREFIX = 'posts:page:'
+CSRF_PLACEHOLDER = b'<!--csrf-token-->'
+CSRF_INPUT_RE = re.compile(
+    rb'(name="csrfmiddlewaretoken" value=")[A-Za-z0-9]+(")'
+)
+
+
+def is_anonymous(request):
+    """Анонимный GET без сессии; request.user при этом не загружается."""
+    return (
+        request.method in ('GET', 'HEAD')
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+    )
+
+
+def page_key(request):
+    raw = request.get_host() + request.get_full_path()
+    return KEY_PREFIX + hashlib.md5(raw.encode()).hexdigest()
+
+
+def _cacheable(request, response):
+    feeds = getattr(request, 'etag_feeds', None)
+    # etag_feeds ставят и другие представления ресурса, например JSON
+    # API; кэшируются только страницы, чей ETag сверяется при выдаче.
+    return (
+        feeds is not None
+        and response.status_code == HTTPStatus.OK
+        and not response.streaming
+        and not response.cookies
+        and response.get('ETag') == quote_etag(page_etag(request, feeds))
+    )
+
+
+def _with_placeholders(request, response):
+    """Копия ответа с меткой вместо CSRF-токена или None."""
+    cached = copy.copy(response)
+    if request.META.get('CSRF_COOKIE_USED'):
+        content, found = CSRF_INPUT_RE.subn(
+            rb'\1' + CSRF_PLACEHOLDER + rb'\2', response.content,
+        )
+        if not found:
+            # Токен выведен где-то вне формы, подставить его нельзя.
+            return None
+        cached.content = content
+    return cached
+
+
+def _filled(request, response):
+    if CSRF_PLACEHOLDER in response.content:
+        response.content = response.content.replace(
+            CSRF_PLACEHOLDER, get_token(request).encode(),
+        )
+    return response
+
+
+class AnonymousPageCacheMiddleware:
+    """Отдает анонимам страницы из кэша, пока не сменились их ленты."""
+
+    def __init__(self, get_response):
+        if not settings.POSTS_PAGE_CACHE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not is_anonymous(request):
+            return self.get_response(request)
+        key = page_key(request)
+        entry = cache.get(key)
+        if entry is not None:
+            feeds, response = entry
+            if quote_etag(page_etag(request, feeds)) == response['ETag']:
+                return get_conditional_response(
+                    request,
+                    etag=response['ETag'],
+                    response=_filled(request, response),
+                )
+        response = self.get_response(request)
+        if _cacheable(request, response):
+            cached = _with_placeholders(request, response)
+            if cached is not None:
+                cache.set(
+                    key,
+                    (request.etag_feeds, cached),
+                    settings.POSTS_PAGE_CACHE_TIMEOUT,
+                )
+        return response
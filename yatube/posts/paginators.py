@@ -0,0 +1,174 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+CURSOR_NEXT = 'n'
+CURSOR_PREVIOUS = 'p'
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorPage(Sequence):
+    """Страница ленты, построенная по ключу (keyset), а не по смещению."""
+    is_cursor = True
+    number = None
+
+    def __init__(self, object_list, paginator, cursor='',
+                 next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.cursor = cursor
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage {self.cursor or "first"}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Пагинатор без COUNT(*) и OFFSET.
+
+    Страница выбирается условием по полям сортировки относительно
+    крайней записи соседней страницы, поэтому N-я страница стоит
+    столько же, сколько первая. Все поля ordering должны сортироваться
+    в одном направлении, последнее из них должно быть уникальным.
+    По умолчанию берется явная сортировка queryset как есть, а
+    сортировка из Meta модели дополняется pk.
+    """
+
+    def __init__(self, object_list, per_page, ordering=None):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        if ordering is None:
+            ordering = self._default_ordering(object_list)
+        self.ordering = tuple(ordering)
+        self.fields = tuple(name.lstrip('-') for name in self.ordering)
+        self.descending = self.ordering[0].startswith('-')
+        self.reverse_ordering = tuple(
+            name[1:] if name.startswith('-') else f'-{name}'
+            for name in self.ordering
+        )
+
+    @staticmethod
+    def _default_ordering(queryset):
+        if queryset.query.order_by:
+            return queryset.query.order_by
+        ordering = list(queryset.model._meta.ordering)
+        unique = ('pk', queryset.model._meta.pk.name)
+        if not ordering or ordering[-1].lstrip('-') not in unique:
+            descending = bool(ordering) and ordering[0].startswith('-')
+            ordering.append('-pk' if descending else 'pk')
+        return ordering
+
+    def _model_field(self, name):
+        annotation = self.object_list.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        opts = self.object_list.model._meta
+        return opts.pk if name == 'pk' else opts.get_field(name)
+
+    def _values(self, obj):
+        return [getattr(obj, name) for name in self.fields]
+
+    def encode_cursor(self, direction, obj):
+        values = [
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in self._values(obj)
+        ]
+        raw = json.dumps([direction, values], separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        padding = '=' * (-len(cursor) % 4)
+        try:
+            raw = base64.urlsafe_b64decode(cursor + padding)
+            direction, values = json.loads(raw.decode())
+            if direction not in (CURSOR_NEXT, CURSOR_PREVIOUS):
+                raise InvalidCursor(cursor)
+            if len(values) != len(self.fields):
+                raise InvalidCursor(cursor)
+            values = [
+                self._model_field(name).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+        except (binascii.Error, ValueError, TypeError, ValidationError):
+            raise InvalidCursor(cursor)
+        return direction, values
+
+    def _keyset(self, values, lookup):
+        query = Q()
+        for index, name in enumerate(self.fields):
+            condition = Q(**{f'{name}__{lookup}': values[index]})
+            for prev_name, prev_value in zip(
+                self.fields[:index], values[:index]
+            ):
+                condition &= Q(**{prev_name: prev_value})
+            query |= condition
+        return query
+
+    def page(self, cursor=None):
+        """Вернуть страницу по курсору; пустой курсор — первая страница."""
+        if not cursor:
+            items = list(
+                self.object_list.order_by(*self.ordering)[:self.per_page + 1]
+            )
+            has_next, has_previous = len(items) > self.per_page, False
+            items = items[:self.per_page]
+        else:
+            direction, values = self.decode_cursor(cursor)
+            after, before = ('lt', 'gt') if self.descending else ('gt', 'lt')
+            if direction == CURSOR_NEXT:
+                items = list(
+                    self.object_list.filter(self._keyset(values, after))
+                    .order_by(*self.ordering)[:self.per_page + 1]
+                )
+                has_next, has_previous = len(items) > self.per_page, True
+                items = items[:self.per_page]
+            else:
+                items = list(
+                    self.object_list.filter(self._keyset(values, before))
+                    .order_by(*self.reverse_ordering)[:self.per_page + 1]
+                )
+                has_next, has_previous = True, len(items) > self.per_page
+                items = items[:self.per_page][::-1]
+        return CursorPage(
+            items,
+            self,
+            cursor=cursor or '',
+            next_cursor=(
+                self.encode_cursor(CURSOR_NEXT, items[-1])
+                if has_next and items else None
+            ),
+            previous_cursor=(
+                self.encode_cursor(CURSOR_PREVIOUS, items[0])
+                if has_previous and items else None
+            ),
+        )
+
+    def get_page(self, cursor=None):
+        """Как page(), но битый курсор ведет на первую страницу."""
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page()
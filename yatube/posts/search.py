@@ -0,0 +1,246 @@
+"""Полнотекстовый поиск по постам.
+
+На SQLite со сборкой FTS5 тексты постов лежат в виртуальной таблице
+posts_post_fts, которую сигналы обновляют при сохранении и удалении
+поста. На остальных базах (или с POSTS_SEARCH_BACKEND = 'inverted')
+используется обратный индекс SearchTerm: текст разбивается на слова
+в Python, а поиск — это выборка диапазонов по индексу (term, post).
+Оба бэкенда ищут слова запроса как начала слов поста, так что
+«котен» находит и «котенок», и «котенка».
+
+Оба бэкенда отдают только id постов нужной страницы в порядке
+релевантности, сами посты догружаются одним запросом, поэтому
+стоимость страницы не зависит от размера таблицы posts_post.
+"""
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Q, Sum
+
+from .models import Post, SearchTerm
+
+FTS_TABLE = 'posts_post_fts'
+TERM_MAX_LENGTH = 64
+MAX_QUERY_TERMS = 10
+INDEX_BATCH_SIZE = 1000
+WORD_RE = re.compile(r'\w+')
+# Больше любого символа слова: [term, term + PREFIX_END) — все слова,
+# начинающиеся с term, и этот диапазон читается по индексу.
+PREFIX_END = '\U0010ffff'
+
+_fts5_support = {}
+
+
+def normalize(text):
+    """Токенизатор FTS5 не считает 'ё' и 'е' одной буквой, приводим сами."""
+    return text.replace('ё', 'е').replace('Ё', 'Е')
+
+
+def tokenize(text):
+    """Слова текста в нижнем регистре."""
+    return [
+        word for word in WORD_RE.findall(normalize(text).lower())
+        if len(word) <= TERM_MAX_LENGTH
+    ]
+
+
+def query_terms(query):
+    """Различные слова поискового запроса, не больше MAX_QUERY_TERMS."""
+    return list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+
+
+def term_weights(text):
+    return Counter(tokenize(text))
+
+
+def fts5_available(conn=connection):
+    if conn.vendor != 'sqlite':
+        return False
+    if conn.alias not in _fts5_support:
+        with conn.cursor() as cursor:
+            cursor.execute('PRAGMA compile_options')
+            _fts5_support[conn.alias] = (
+                ('ENABLE_FTS5',) in cursor.fetchall()
+            )
+    return _fts5_support[conn.alias]
+
+
+class InvertedIndexBackend:
+    """Обратный индекс в таблице SearchTerm, работает на любой базе."""
+    name = 'inverted'
+
+    def index(self, post):
+        SearchTerm.objects.filter(post_id=post.pk).delete()
+        SearchTerm.objects.bulk_create(
+            SearchTerm(post_id=post.pk, term=term, weight=weight)
+            for term, weight in term_weights(post.text).items()
+        )
+
+    def remove(self, post_id):
+        SearchTerm.objects.filter(post_id=post_id).delete()
+
+    def rebuild(self):
+        SearchTerm.objects.all().delete()
+        batch = []
+        posts = Post.objects.order_by().values_list('pk', 'text')
+        for post_id, text in posts.iterator():
+            batch.extend(
+                SearchTerm(post_id=post_id, term=term, weight=weight)
+                for term, weight in term_weights(text).items()
+            )
+            if len(batch) >= INDEX_BATCH_SIZE:
+                SearchTerm.objects.bulk_create(batch)
+                batch = []
+        SearchTerm.objects.bulk_create(batch)
+
+    @staticmethod
+    def _prefix(term):
+        return Q(term__gte=term, term__lt=term + PREFIX_END)
+
+    def _matches(self, terms):
+        # Пост подходит, если каждое слово запроса начинает какое-то
+        # его слово, как "term"* в FTS5.
+        prefixes = [self._prefix(term) for term in terms]
+        matched = {
+            f'matched_{number}': Count('pk', filter=prefix)
+            for number, prefix in enumerate(prefixes)
+        }
+        any_prefix = Q()
+        for prefix in prefixes:
+            any_prefix |= prefix
+        return SearchTerm.objects.filter(any_prefix).order_by().values(
+            'post',
+        ).annotate(rank=Sum('weight'), **matched).filter(**{
+            f'{name}__gt': 0 for name in matched
+        })
+
+    def count(self, terms):
+        return self._matches(terms).count()
+
+    def ranked_ids(self, terms, start, stop):
+        return list(
+            self._matches(terms).order_by('-rank', '-post')
+            .values_list('post', flat=True)[start:stop]
+        )
+
+    def filter(self, queryset, terms):
+        return queryset.filter(pk__in=self._matches(terms).values('post'))
+
+
+class FTS5Backend:
+    """Виртуальная таблица SQLite FTS5 с ранжированием по BM25."""
+    name = 'fts5'
+
+    def _execute(self, sql, params=()):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def index(self, post):
+        self.remove(post.pk)
+        self._execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, text) VALUES (%s, %s)',
+            [post.pk, normalize(post.text)],
+        )
+
+    def remove(self, post_id):
+        self._execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id])
+
+    def rebuild(self):
+        self._execute(f'DELETE FROM {FTS_TABLE}')
+        self._execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, text) '
+            f"SELECT id, REPLACE(REPLACE(text, 'ё', 'е'), 'Ё', 'Е') "
+            f'FROM {Post._meta.db_table}'
+        )
+
+    @staticmethod
+    def match_expression(terms):
+        # Слова состоят только из \w, поэтому кавычки их не ломают;
+        # звездочка ищет и словоформы с тем же началом.
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    def count(self, terms):
+        return self._execute(
+            f'SELECT COUNT(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            [self.match_expression(terms)],
+        )[0][0]
+
+    def ranked_ids(self, terms, start, stop):
+        rows = self._execute(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            f'ORDER BY rank, rowid DESC LIMIT %s OFFSET %s',
+            [self.match_expression(terms), stop - start, start],
+        )
+        return [row[0] for row in rows]
+
+    def filter(self, queryset, terms):
+        # extra, а не pk__in=RawSQL: RawSQL в IN оборачивается во вторые
+        # скобки и становится скалярным подзапросом из одной строки.
+        return queryset.extra(
+            where=[
+                f'{Post._meta.db_table}.id IN (SELECT rowid FROM '
+                f'{FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)',
+            ],
+            params=[self.match_expression(terms)],
+        )
+
+
+BACKENDS = {
+    backend.name: backend for backend in (FTS5Backend, InvertedIndexBackend)
+}
+
+
+def backend_name(conn=connection):
+    name = settings.POSTS_SEARCH_BACKEND
+    if name == 'auto':
+        name = FTS5Backend.name if fts5_available(conn) else (
+            InvertedIndexBackend.name
+        )
+    return name
+
+
+def get_backend():
+    return BACKENDS[backend_name()]()
+
+
+class SearchResults:
+    """Результаты поиска для Paginator: считает и режет без выборки всех."""
+
+    def __init__(self, query, queryset=None, backend=None):
+        self.terms = query_terms(query)
+        self.queryset = Post.objects.all() if queryset is None else queryset
+        self.backend = backend or get_backend()
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            self._count = self.backend.count(self.terms) if self.terms else 0
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop, _ = index.indices(self.count())
+        if not self.terms or start >= stop:
+            return []
+        ids = self.backend.ranked_ids(self.terms, start, stop)
+        posts = self.queryset.in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
+
+
+def search_posts(query, queryset=None):
+    return SearchResults(query, queryset)
+
+
+def filter_posts(queryset, query):
+    """Оставить в queryset только посты, подходящие под запрос."""
+    terms = query_terms(query)
+    if not terms:
+        return queryset.none()
+    return get_backend().filter(queryset, terms)
@@ -0,0 +1,166 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import counters, feed_cache, search, tasks, thumbnails, timeline
+from .models import Comment, Follow, Group, Post, Profile, User
+
+
+def switch_fan_out(author_id):
+    if timeline.update_fan_out(author_id):
+        tasks.resume_fan_out.delay(author_id)
+
+
+@receiver(post_save, sender=User)
+def create_profile(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Profile.objects.get_or_create(user=instance)
+
+
+# Первым среди обработчиков комментария: остальные, например сброс
+# кэша веток, должны видеть уже готовый путь.
+@receiver(post_save, sender=Comment)
+def finish_comment_path(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and not instance.path:
+        instance.finish_path()
+
+
+@receiver(post_save, sender=Post)
+def count_new_post(sender, instance, created, **kwargs):
+    if created:
+        counters.change_user_counter(instance.author_id, 'posts_count', 1)
+
+
+@receiver(post_save, sender=Post)
+def fan_out_new_post(sender, instance, created, **kwargs):
+    if created:
+        timeline.fan_out_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    counters.change_user_counter(instance.author_id, 'posts_count', -1)
+
+
+@receiver(post_save, sender=Comment)
+def count_new_comment(sender, instance, created, **kwargs):
+    if created:
+        counters.change_comments_counter(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    counters.change_comments_counter(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Follow)
+def count_new_follow(sender, instance, created, **kwargs):
+    if created:
+        counters.change_user_counter(instance.author_id, 'followers_count', 1)
+        counters.change_user_counter(instance.user_id, 'following_count', 1)
+
+
+# Между счетчиком и лентой: раскладка решается по новому числу
+# подписчиков.
+@receiver(post_save, sender=Follow)
+def switch_fan_out_on_follow(sender, instance, created, **kwargs):
+    if created:
+        switch_fan_out(instance.author_id)
+
+
+@receiver(post_save, sender=Follow)
+def backfill_timeline(sender, instance, created, **kwargs):
+    if created:
+        timeline.backfill(instance)
+
+
+@receiver(post_delete, sender=Follow)
+def count_deleted_follow(sender, instance, **kwargs):
+    counters.change_user_counter(instance.author_id, 'followers_count', -1)
+    counters.change_user_counter(instance.user_id, 'following_count', -1)
+
+
+@receiver(post_delete, sender=Follow)
+def switch_fan_out_on_unfollow(sender, instance, **kwargs):
+    switch_fan_out(instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def drop_from_timeline(sender, instance, **kwargs):
+    timeline.drop(instance)
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_post(sender, instance, raw=False, **kwargs):
+    instance._previous_group_id = None
+    instance._previous_image = None
+    if instance.pk and not raw:
+        previous = Post.objects.filter(pk=instance.pk).values(
+            'group_id', 'image',
+        ).first() or {}
+        instance._previous_group_id = previous.get('group_id')
+        instance._previous_image = previous.get('image')
+
+
+# После remember_previous_post: новая картинка сравнивается со старой.
+# Из формы, админки и кода сброс миниатюр выходит одинаковым.
+@receiver(pre_save, sender=Post)
+def reset_changed_thumbnails(sender, instance, raw=False,
+                             update_fields=None, **kwargs):
+    instance._thumbnails_reset = False
+    if raw or update_fields is not None and 'image' not in update_fields:
+        return
+    if (instance.image.name or '') != (instance._previous_image or ''):
+        thumbnails.mark_pending(instance)
+        instance._thumbnails_reset = True
+
+
+@receiver(post_save, sender=Post)
+def schedule_thumbnails(sender, instance, **kwargs):
+    if getattr(instance, '_thumbnails_reset', False):
+        tasks.schedule_thumbnail(instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_feeds(sender, instance, **kwargs):
+    feed_cache.bump(*feed_cache.post_feeds(
+        instance.author_id,
+        instance.group_id,
+        getattr(instance, '_previous_group_id', None),
+    ))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_feeds(sender, instance, **kwargs):
+    post = Post.objects.filter(pk=instance.post_id).values(
+        'author_id', 'group_id',
+    ).first()
+    feed_cache.bump(feed_cache.comments(instance.post_id))
+    if post is not None:
+        feed_cache.bump(
+            *feed_cache.post_feeds(post['author_id'], post['group_id'])
+        )
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group_feeds(sender, instance, **kwargs):
+    feed_cache.bump(feed_cache.INDEX, feed_cache.group(instance.pk))
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_follow_feed(sender, instance, **kwargs):
+    feed_cache.bump(feed_cache.follow(instance.user_id))
+
+
+@receiver(post_save, sender=Post)
+def index_post_text(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or 'text' in update_fields:
+        search.get_backend().index(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_text(sender, instance, **kwargs):
+    search.get_backend().remove(instance.pk)
@@ -0,0 +1,22 @@
+from jobs.queue import task
+
+from . import thumbnails, timeline
+from .models import Post
+
+
+@task(max_attempts=3)
+def generate_thumbnail(post_id):
+    post = Post.objects.filter(pk=post_id, thumbnail_pending=True).first()
+    if post is not None:
+        thumbnails.generate(post)
+
+
+@task
+def resume_fan_out(author_id):
+    timeline.resume_fan_out(author_id)
+
+
+def schedule_thumbnail(post):
+    """Поставить в очередь миниатюры поста, если они ждут генерации."""
+    if post.thumbnail_pending:
+        generate_thumbnail.delay(post.pk)
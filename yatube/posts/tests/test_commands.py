@@ -0,0 +1,102 @@
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models import Comment, Follow, Group, Post, TimelineEntry
+
+User = get_user_model()
+
+
+class ExplainFeedsCommandTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.author = User.objects.create_user(username='Author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Тестовый текст поста',
+            group=cls.group,
+        )
+        Comment.objects.create(
+            post=cls.post,
+            author=cls.user,
+            text='Тестовый комментарий',
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def test_feed_queries_use_indexes(self):
+        """Запросы всех лент обходятся без полного чтения таблиц."""
+        out = StringIO()
+        call_command('explain_feeds', '--check', stdout=out)
+        for feed in ('index', 'group_posts', 'profile', 'follow_index'):
+            with self.subTest(feed=feed):
+                self.assertIn(feed, out.getvalue())
+
+
+class BenchmarkViewsCommandTest(TestCase):
+    def test_report_covers_all_views(self):
+        """Отчет в JSON содержит метрики каждого представления."""
+        out = StringIO()
+        call_command(
+            'benchmark_views', '--current-db',
+            '--users', '3', '--groups', '1', '--posts', '3',
+            '--comments', '2', '--follows', '2',
+            '--requests', '2', '--warmup', '0',
+            stdout=out,
+        )
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['volumes']['posts'], 3)
+        self.assertEqual(
+            set(report['views']),
+            {'index', 'group_posts', 'profile', 'post_detail',
+             'follow_index', 'post_create'},
+        )
+        for name, result in report['views'].items():
+            with self.subTest(view=name):
+                self.assertEqual(result['requests'], 2)
+                self.assertGreater(result['queries_per_request'], 0)
+
+
+class SeedDataCommandTest(TestCase):
+    def test_seeded_data_is_consistent(self):
+        """Счетчики и ленты после массовой загрузки совпадают с данными."""
+        call_command(
+            'seed_data',
+            '--users', '10', '--groups', '2', '--posts', '60',
+            '--comments', '40', '--follows', '15', '--chunk-size', '25',
+            stdout=StringIO(),
+        )
+        self.assertEqual(User.objects.count(), 10)
+        self.assertEqual(Post.objects.count(), 60)
+        self.assertEqual(Comment.objects.count(), 40)
+        self.assertEqual(Follow.objects.count(), 15)
+        for user in User.objects.select_related('profile'):
+            with self.subTest(user=user.username):
+                self.assertEqual(
+                    user.profile.posts_count, user.posts.count(),
+                )
+                self.assertEqual(
+                    user.profile.followers_count, user.following.count(),
+                )
+        for post in Post.objects.all():
+            self.assertEqual(post.comments_count, post.comments.count())
+        follow = Follow.objects.first()
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=follow.user_id).count(),
+            Post.objects.filter(
+                author__following__user=follow.user_id,
+            ).count(),
+        )
+        self.assertEqual(
+            Post.objects.filter(created__gt=timezone.now()).count(), 0,
+        )
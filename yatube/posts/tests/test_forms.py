@@ -1,13 +1,22 @@
 from datetime import timedelta
+from http import HTTPStatus
+from io import BytesIO, StringIO
 import tempfile
 import shutil
+from unittest import mock
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
 from django.test import TestCase, Client, override_settings
 from django.urls import reverse
+from PIL import Image
 
+from jobs.models import Job
+
+from ..forms import PostForm
+from ..images import RejectedUpload
 from ..models import Comment, Group, Post
 
 User = get_user_model()
@@ -102,6 +111,15 @@ class PostFormCreateTest(TestCase):
         self.assertEqual(latest_post.text, 'Пост с картинкой')
         self.assertEqual(latest_post.author.username, self.user.username)
         self.assertEqual(latest_post.image, 'posts/image.gif')
+        self.assertTrue(latest_post.thumbnail_pending)
+        self.assertEqual(latest_post.thumbnail, '')
+        call_command('run_jobs', '--once', stdout=StringIO())
+        latest_post.refresh_from_db()
+        self.assertFalse(latest_post.thumbnail_pending)
+        self.assertTrue(latest_post.thumbnail.startswith(settings.MEDIA_URL))
+        self.assertIn(' 480w, ', latest_post.thumbnail_srcset)
+        self.assertIn('.webp 480w', latest_post.thumbnail_webp_srcset)
+        self.assertNotIn('1440w', latest_post.thumbnail_srcset)
 
     def test_edit_post(self):
         """Редактирование поста работает корректно."""
@@ -153,6 +171,152 @@ class PostFormCreateTest(TestCase):
         self.assertEqual(latest_post.group.id, self.another_group.id)
         self.assertEqual(latest_post.author.username, self.user.username)
 
+    def test_image_saved_outside_form_gets_thumbnails(self):
+        """Миниатюры ставятся в очередь при любом сохранении картинки."""
+        jobs = Job.objects.filter(task='posts.tasks.generate_thumbnail')
+        post = Post.objects.create(text='Пост из админки', author=self.user)
+        post.image = jpeg_upload((20, 10))
+        post.save()
+        self.assertEqual(jobs.count(), 1)
+        post.text = 'Поменялся только текст'
+        post.save()
+        self.assertEqual(jobs.count(), 1)
+        call_command('run_jobs', '--once', stdout=StringIO())
+        post.refresh_from_db()
+        self.assertFalse(post.thumbnail_pending)
+        self.assertTrue(post.thumbnail)
+
+        post.image = None
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual(post.thumbnail, '')
+        self.assertFalse(jobs.exists())
+
+    def test_thumbnail_error_is_retried(self):
+        """Временная ошибка оставляет пост ожидающим, задача повторится."""
+        jobs = Job.objects.filter(task='posts.tasks.generate_thumbnail')
+        post = Post.objects.create(
+            text='Пост с картинкой', author=self.user,
+            image=jpeg_upload((20, 10)),
+        )
+        with mock.patch(
+            'posts.thumbnails.get_thumbnail', side_effect=OSError('диск'),
+        ), self.assertLogs('yatube.jobs', 'ERROR'):
+            call_command('run_jobs', '--once', stdout=StringIO())
+        post.refresh_from_db()
+        self.assertTrue(post.thumbnail_pending)
+        self.assertEqual(jobs.get().status, Job.QUEUED)
+
+    def test_unreadable_image_is_not_retried(self):
+        post = Post.objects.create(
+            text='Пост с битой картинкой', author=self.user,
+            image=SimpleUploadedFile('broken.jpg', b'not an image'),
+        )
+        with self.assertLogs('yatube.thumbnails', 'WARNING'):
+            call_command('run_jobs', '--once', stdout=StringIO())
+        post.refresh_from_db()
+        self.assertFalse(post.thumbnail_pending)
+        self.assertEqual(post.thumbnail, '')
+        self.assertFalse(Job.objects.filter(
+            task='posts.tasks.generate_thumbnail',
+        ).exists())
+
+
+def jpeg_upload(size, exif=False):
+    output = BytesIO()
+    image = Image.new('RGB', size, color=(255, 0, 0))
+    options = {}
+    if exif:
+        image_exif = Image.Exif()
+        image_exif[0x010F] = 'Camera maker'
+        options['exif'] = image_exif.tobytes()
+    image.save(output, 'JPEG', **options)
+    return SimpleUploadedFile(
+        'photo.jpg', output.getvalue(), content_type='image/jpeg',
+    )
+
+
+class PostFormImageTest(TestCase):
+    def get_form(self, upload):
+        return PostForm(
+            data={'text': 'Пост с загруженной картинкой'},
+            files={'image': upload},
+        )
+
+    @override_settings(POSTS_IMAGE_MAX_PIXELS=100)
+    def test_too_many_pixels_rejected(self):
+        """Картинка с лишними пикселями отклоняется до декодирования."""
+        form = self.get_form(jpeg_upload((20, 10)))
+        self.assertFalse(form.is_valid())
+        self.assertIn('image', form.errors)
+
+    @override_settings(POSTS_IMAGE_MAX_BYTES=10)
+    def test_too_big_file_rejected(self):
+        """Слишком тяжелый файл отклоняется."""
+        form = self.get_form(jpeg_upload((20, 10)))
+        self.assertFalse(form.is_valid())
+        self.assertIn('image', form.errors)
+
+    @override_settings(POSTS_IMAGE_MAX_SIDE=10)
+    def test_oversized_image_downsized_without_exif(self):
+        """Большой оригинал уменьшается, EXIF удаляется."""
+        form = self.get_form(jpeg_upload((40, 20), exif=True))
+        self.assertTrue(form.is_valid(), form.errors)
+        image = Image.open(form.cleaned_data['image'])
+        self.assertEqual(image.size, (10, 5))
+        self.assertFalse(image.getexif())
+
+    @override_settings(POSTS_IMAGE_MAX_BYTES=100)
+    def test_upload_stopped_at_size_limit(self):
+        """Прием файла прерывается на лимите, пост не создается."""
+        user = User.objects.create_user(username='Uploader')
+        self.client.force_login(user)
+        response = self.client.post(reverse('posts:post_create'), {
+            'text': 'Пост со слишком тяжелой картинкой',
+            'image': jpeg_upload((200, 100)),
+        })
+        self.assertFormError(
+            response, 'form', 'image', 'Файл слишком большой: не больше 0 МБ',
+        )
+        self.assertFalse(Post.objects.exists())
+        self.assertIsInstance(
+            response.wsgi_request.FILES['image'], RejectedUpload,
+        )
+
+    def test_post_form_still_checks_csrf(self):
+        """Обработчик ставится до CSRF, но проверка не пропадает."""
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(User.objects.create_user(username='Uploader'))
+        response = client.post(reverse('posts:post_create'), {
+            'text': 'Пост без CSRF-токена',
+        })
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+
+    @override_settings(POSTS_IMAGE_MAX_SIDE=10)
+    def test_animated_image_kept_as_is(self):
+        """Анимация не пересохраняется, иначе остался бы один кадр."""
+        output = BytesIO()
+        frames = [
+            Image.new('RGB', (40, 20), color)
+            for color in ((255, 0, 0), (0, 255, 0))
+        ]
+        frames[0].save(
+            output, 'PNG', save_all=True, append_images=frames[1:],
+        )
+        upload = SimpleUploadedFile(
+            'animation.png', output.getvalue(), content_type='image/png',
+        )
+        form = self.get_form(upload)
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertIs(form.cleaned_data['image'], upload)
+
+    def test_small_image_kept_as_is(self):
+        """Картинка без EXIF в пределах лимитов не пересохраняется."""
+        upload = jpeg_upload((20, 10))
+        form = self.get_form(upload)
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertIs(form.cleaned_data['image'], upload)
+
 
 class CommentFormTest(TestCase):
     @classmethod
@@ -200,3 +364,27 @@ class CommentFormTest(TestCase):
         self.assertEqual(latest_comment.text, comment_form_data['text'])
         self.assertEqual(latest_comment.author.username, self.user.username)
         self.assertIn(latest_comment, response.context['comments'])
+
+    def test_reply_joins_comment_thread(self):
+        """Ответ попадает в ветку комментария и показывается под ним."""
+        other_post = Post.objects.create(text='Другой пост', author=self.user)
+        foreign_comment = Comment.objects.create(
+            post=other_post, author=self.user, text='Чужой комментарий',
+        )
+        url = reverse('posts:add_comment', kwargs={'post_id': self.post.pk})
+        self.authorized_client.post(
+            url, {'text': 'Ответ на чужой пост', 'parent': foreign_comment.pk},
+        )
+        self.assertFalse(
+            Comment.objects.filter(text='Ответ на чужой пост').exists()
+        )
+        response = self.authorized_client.post(
+            url,
+            {'text': 'Ответ на комментарий', 'parent': self.comment.pk},
+            follow=True,
+        )
+        reply = Comment.objects.get(text='Ответ на комментарий')
+        self.assertEqual(reply.parent, self.comment)
+        self.assertEqual(reply.root, self.comment)
+        self.assertEqual(reply.depth, 1)
+        self.assertIn(reply, response.context['comments'][0].thread_replies)
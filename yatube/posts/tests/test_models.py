@@ -1,7 +1,12 @@
+from io import StringIO
+
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
 
-from ..models import Group, Post, POST_MAX_LENGTH_NAME
+from ..models import (
+    COMMENT_MAX_DEPTH, Comment, Follow, Group, Post, POST_MAX_LENGTH_NAME,
+)
 
 User = get_user_model()
 
@@ -60,3 +65,86 @@ class PostModelTest(TestCase):
                 self.assertEqual(
                     post._meta.get_field(field).help_text, expected_value
                 )
+
+
+class CountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.follower = User.objects.create_user(username='follower')
+
+    def test_counters_follow_writes(self):
+        """Счетчики обновляются при создании и удалении объектов."""
+        post = Post.objects.create(author=self.user, text='Тестовый текст')
+        Comment.objects.create(
+            post=post, author=self.follower, text='Комментарий',
+        )
+        follow = Follow.objects.create(user=self.follower, author=self.user)
+        post.refresh_from_db()
+        self.user.profile.refresh_from_db()
+        self.follower.profile.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(self.user.profile.posts_count, 1)
+        self.assertEqual(self.user.profile.followers_count, 1)
+        self.assertEqual(self.follower.profile.following_count, 1)
+        follow.delete()
+        post.delete()
+        self.user.profile.refresh_from_db()
+        self.follower.profile.refresh_from_db()
+        self.assertEqual(self.user.profile.posts_count, 0)
+        self.assertEqual(self.user.profile.followers_count, 0)
+        self.assertEqual(self.follower.profile.following_count, 0)
+
+    def test_repair_counters(self):
+        """repair_counters пересчитывает рассогласованные счетчики."""
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Пост {number}')
+            for number in range(3)
+        )
+        post = Post.objects.first()
+        Comment.objects.bulk_create(
+            Comment(post=post, author=self.user, text=f'Ответ {number}')
+            for number in range(2)
+        )
+        self.user.profile.delete()
+        call_command('repair_counters', stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 2)
+        self.assertEqual(
+            User.objects.get(pk=self.user.pk).profile.posts_count, 3
+        )
+
+
+class CommentThreadTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    def reply(self, parent, text):
+        return Comment.objects.create(
+            post=self.post, author=self.user, parent=parent, text=text,
+        )
+
+    def test_subtree_in_tree_order(self):
+        """Ветка читается одним запросом в порядке обхода дерева."""
+        root = self.reply(None, 'Начало ветки')
+        first = self.reply(root, 'Первый ответ')
+        second = self.reply(root, 'Второй ответ')
+        nested = self.reply(first, 'Ответ на первый ответ')
+        self.reply(None, 'Другая ветка')
+        with self.assertNumQueries(1):
+            subtree = list(root.subtree())
+        self.assertEqual(subtree, [root, first, nested, second])
+        self.assertEqual(
+            [comment.depth for comment in subtree], [0, 1, 2, 1],
+        )
+        self.assertEqual(list(first.subtree()), [first, nested])
+
+    def test_depth_is_limited(self):
+        parent = self.reply(None, 'Начало ветки')
+        for level in range(COMMENT_MAX_DEPTH + 2):
+            parent = self.reply(parent, f'Ответ уровня {level + 1}')
+        self.assertEqual(parent.depth, COMMENT_MAX_DEPTH)
@@ -0,0 +1,79 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.query_budget import QueryBudgetExceeded
+from core.testing import QueryBudgetTestMixin
+from .. import views
+from ..models import Comment, Follow, Group, Post
+from ..views import POSTS_AMOUNT
+
+User = get_user_model()
+
+
+class FeedQueryBudgetTest(QueryBudgetTestMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.authors = [
+            User.objects.create_user(username=f'Author{number}')
+            for number in range(POSTS_AMOUNT + 1)
+        ]
+        for author in cls.authors:
+            Follow.objects.create(user=cls.user, author=author)
+            Post.objects.create(
+                author=author,
+                text=f'Пост автора {author.username}',
+                group=cls.group,
+            )
+        cls.post = Post.objects.first()
+        for author in cls.authors:
+            Comment.objects.create(
+                post=cls.post,
+                author=author,
+                text=f'Комментарий автора {author.username}',
+            )
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        cache.clear()
+
+    def test_views_within_query_budget(self):
+        """Число запросов не растет с числом постов и комментариев."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:follow_index'),
+            reverse(
+                'posts:group_posts',
+                kwargs={'slug': self.group.slug},
+            ),
+            reverse(
+                'posts:profile',
+                kwargs={'username': self.post.author.username},
+            ),
+            reverse(
+                'posts:post_detail',
+                kwargs={'post_id': self.post.pk},
+            ),
+        )
+        for client in (Client(), self.authorized_client):
+            for url in urls:
+                with self.subTest(url=url):
+                    self.assertWithinQueryBudget(client, url)
+
+    @override_settings(QUERY_BUDGET_ENABLED=True, QUERY_BUDGET_STRICT=True)
+    def test_middleware_rejects_view_over_budget(self):
+        """Middleware в строгом режиме не пропускает превышение бюджета."""
+        with mock.patch.object(views.index, 'query_budget', 0):
+            with self.assertRaises(QueryBudgetExceeded):
+                Client().get(reverse('posts:index'))
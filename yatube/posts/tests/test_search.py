@@ -0,0 +1,125 @@
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from ..models import Post, SearchTerm
+from ..search import filter_posts, search_posts
+
+User = get_user_model()
+
+
+class SearchBackendMixin:
+    backend = None
+
+    def setUp(self):
+        self.override = override_settings(POSTS_SEARCH_BACKEND=self.backend)
+        self.override.enable()
+        self.author = User.objects.create_user(username='Author')
+        self.kitten = Post.objects.create(
+            author=self.author,
+            text='Котенок нашел ёлку, котенок доволен',
+        )
+        self.puppy = Post.objects.create(
+            author=self.author,
+            text='Щенок нашел котенка',
+        )
+        self.other = Post.objects.create(
+            author=self.author,
+            text='Совсем о другом',
+        )
+
+    def tearDown(self):
+        self.override.disable()
+
+    def search(self, query):
+        return list(search_posts(query)[:10])
+
+    def test_all_words_required(self):
+        """Найдены только посты, в которых есть все слова запроса."""
+        self.assertEqual(self.search('нашел щенок'), [self.puppy])
+        self.assertEqual(self.search('ничего такого'), [])
+        self.assertEqual(self.search('  '), [])
+
+    def test_results_ranked(self):
+        """Пост, где слово встречается чаще, идет первым."""
+        self.assertEqual(self.search('котенок')[0], self.kitten)
+
+    def test_yo_matches_ye(self):
+        self.assertEqual(self.search('елку'), [self.kitten])
+
+    def test_index_follows_changes(self):
+        """Индекс обновляется при правке и удалении поста."""
+        self.other.text = 'Теперь и тут котенок'
+        self.other.save()
+        self.assertIn(self.other, self.search('котенок'))
+        self.puppy.delete()
+        self.assertEqual(self.search('щенок'), [])
+
+    def test_pagination(self):
+        results = search_posts('нашел')
+        self.assertEqual(results.count(), 2)
+        self.assertEqual(len(results[1:2]), 1)
+
+    def test_prefix_match(self):
+        """Находятся словоформы с тем же началом."""
+        self.assertEqual(len(self.search('котен')), 2)
+        self.assertEqual(self.search('котен щен'), [self.puppy])
+        self.assertEqual(self.search('котенокк'), [])
+
+    def test_filter_queryset(self):
+        """Админка фильтрует queryset тем же индексом."""
+        queryset = filter_posts(Post.objects.all(), 'нашел')
+        self.assertEqual(set(queryset), {self.kitten, self.puppy})
+
+
+class FTS5SearchTest(SearchBackendMixin, TestCase):
+    backend = 'fts5'
+
+
+class InvertedIndexSearchTest(SearchBackendMixin, TestCase):
+    backend = 'inverted'
+
+    def test_terms_stored(self):
+        self.assertEqual(
+            SearchTerm.objects.get(post=self.kitten, term='котенок').weight,
+            2,
+        )
+
+
+class SearchViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='Author')
+        Post.objects.bulk_create(
+            Post(author=cls.author, text=f'Пост номер {number}')
+            for number in range(3)
+        )
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Единственный искомый пост',
+        )
+        cls.superuser = User.objects.create_superuser(
+            username='Admin', email='admin@example.com', password='pass',
+        )
+
+    def test_search_page(self):
+        response = self.client.get(
+            reverse('posts:search'), {'q': 'искомый'},
+        )
+        self.assertTemplateUsed(response, 'posts/search.html')
+        self.assertEqual(list(response.context['page_obj']), [self.post])
+        self.assertEqual(
+            response.context['page_query'], urlencode({'q': 'искомый'}) + '&',
+        )
+
+    def test_admin_search(self):
+        model_admin = admin.site._registry[Post]
+        self.assertIn('text', model_admin.search_fields)
+        request = RequestFactory().get('/admin/posts/post/')
+        request.user = self.superuser
+        queryset, _ = model_admin.get_search_results(
+            request, Post.objects.all(), 'искомый',
+        )
+        self.assertEqual(list(queryset), [self.post])
@@ -50,6 +50,7 @@ class PostsURLTests(TestCase):
                 'posts:post_detail',
                 kwargs={'post_id': self.post.pk},
             ),
+            reverse('posts:search'),
         )
         for url in public_urls:
             with self.subTest(url=url):
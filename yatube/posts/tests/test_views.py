@@ -1,17 +1,25 @@
 import shutil
 import tempfile
 from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
 from django.db.models.fields.files import ImageFieldFile
-from django.test import TestCase, Client, override_settings
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
 from django.urls import reverse
 
+from .. import page_cache
+from ..comments import (
+    COMMENTS_AMOUNT, THREAD_REPLIES_AMOUNT, comments_page,
+)
 from ..forms import PostForm
-from ..models import Group, Post, Follow
+from ..models import Comment, Group, Post, Follow
 from ..views import POSTS_AMOUNT
 
 User = get_user_model()
@@ -230,11 +238,32 @@ class PostsPagesTests(TestCase):
         )
         response = self.authorized_client.get(reverse('posts:index'))
         first_content = response.content.decode('utf-8')
-        post.delete()
+        Post.objects.filter(pk=post.pk).update(text='Текст мимо сигналов')
         response = self.authorized_client.get(reverse('posts:index'))
         second_content = response.content.decode('utf-8')
         self.assertEqual(first_content, second_content)
 
+    def test_feed_caches_invalidated_on_change(self):
+        """Изменение поста сразу сбрасывает кэш всех его лент."""
+        post = Post.objects.create(
+            text='Самый уникальный текст, который есть только в этом посте',
+            author=self.user,
+            group=self.group,
+        )
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_posts', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user.username}),
+        )
+        for url in urls:
+            self.assertContains(self.authorized_client.get(url), post.text)
+        post.delete()
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertNotContains(
+                    self.authorized_client.get(url), post.text
+                )
+
     def test_index_page_without_caching(self):
         """Проверка главной страницы без кэширования"""
         post = Post.objects.create(
@@ -371,3 +400,391 @@ class PaginatorViewsTest(TestCase):
                     len(response_second_page.context['page_obj']),
                     posts_on_second_page
                 )
+
+
+@override_settings(POSTS_CURSOR_PAGINATION=True)
+class CursorPaginatorViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create(
+            Post(
+                author=cls.user,
+                text=f'Тестовый пост под номером {post_number}',
+                group=cls.group,
+            )
+            for post_number in range(13)
+        )
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        cache.clear()
+
+    def test_pages_follow_cursors(self):
+        """Курсоры ведут на следующую и обратно на предыдущую страницу."""
+        urls = (
+            reverse('posts:index'),
+            reverse(
+                'posts:group_posts',
+                kwargs={'slug': self.group.slug},
+            ),
+            reverse(
+                'posts:profile',
+                kwargs={'username': self.user.username},
+            ),
+        )
+        expected = list(Post.objects.order_by('-created', '-pk'))
+        for url in urls:
+            with self.subTest(url=url):
+                first_page = self.authorized_client.get(
+                    url
+                ).context['page_obj']
+                self.assertEqual(list(first_page), expected[:POSTS_AMOUNT])
+                self.assertFalse(first_page.has_previous())
+                second_page = self.authorized_client.get(
+                    url, {'cursor': first_page.next_cursor},
+                ).context['page_obj']
+                self.assertEqual(list(second_page), expected[POSTS_AMOUNT:])
+                self.assertFalse(second_page.has_next())
+                previous_page = self.authorized_client.get(
+                    url, {'cursor': second_page.previous_cursor},
+                ).context['page_obj']
+                self.assertEqual(
+                    list(previous_page), expected[:POSTS_AMOUNT]
+                )
+
+    def test_invalid_cursor_returns_first_page(self):
+        """Битый курсор не ломает страницу, а ведет на первую."""
+        response = self.authorized_client.get(
+            reverse('posts:index'), {'cursor': 'not-a-cursor'}
+        )
+        self.assertEqual(
+            len(response.context['page_obj']), POSTS_AMOUNT
+        )
+
+
+class CommentPaginationTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.post = Post.objects.create(author=cls.user, text='Тестовый пост')
+        Comment.objects.bulk_create(
+            Comment(
+                post=cls.post,
+                author=cls.user,
+                text=f'Комментарий номер {comment_number}',
+            )
+            for comment_number in range(COMMENTS_AMOUNT + 5)
+        )
+
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+
+    def test_comments_load_in_chunks(self):
+        """Комментарии приходят страницами, остальные — порциями."""
+        expected = list(self.post.comments.order_by('-created', '-pk'))
+        url = reverse('posts:post_detail', args=(self.post.pk,))
+        first_page = self.client.get(url).context['comments']
+        self.assertEqual(list(first_page), expected[:COMMENTS_AMOUNT])
+        response = self.client.get(
+            reverse('posts:post_comments', args=(self.post.pk,)),
+            {'cursor': first_page.next_cursor},
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTemplateNotUsed(response, 'base.html')
+        self.assertEqual(
+            list(response.context['comments']), expected[COMMENTS_AMOUNT:],
+        )
+        self.assertFalse(response.context['comments'].has_next())
+
+    def test_oldest_first(self):
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.post.pk,)),
+            {'order': 'oldest'},
+        )
+        self.assertEqual(
+            list(response.context['comments']),
+            list(self.post.comments.order_by('created', 'pk'))[
+                :COMMENTS_AMOUNT
+            ],
+        )
+
+    def test_first_page_cached_until_new_comment(self):
+        """Первая страница берется из кэша, пока не появится комментарий."""
+        comments_page(self.post.pk)
+        with self.assertNumQueries(0):
+            comments_page(self.post.pk)
+        comment = Comment.objects.create(
+            post=self.post, author=self.user, text='Свежий комментарий',
+        )
+        self.assertEqual(comments_page(self.post.pk)[0], comment)
+
+    def test_long_thread_loads_replies_in_chunks(self):
+        """Ветка показывает первые ответы, остальные подгружаются."""
+        root = Comment.objects.create(
+            post=self.post, author=self.user, text='Начало ветки',
+        )
+        replies = [
+            Comment.objects.create(
+                post=self.post, author=self.user, parent=root,
+                text=f'Ответ {number}',
+            )
+            for number in range(THREAD_REPLIES_AMOUNT + 2)
+        ]
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.post.pk,)),
+        )
+        first = response.context['comments'][0]
+        self.assertEqual(first, root)
+        self.assertEqual(
+            first.thread_replies, replies[:THREAD_REPLIES_AMOUNT],
+        )
+        response = self.client.get(
+            reverse('posts:post_comments', args=(self.post.pk,)),
+            {'thread': root.pk, 'after': first.thread_next},
+        )
+        self.assertEqual(
+            response.context['replies'], replies[THREAD_REPLIES_AMOUNT:],
+        )
+        self.assertIsNone(response.context['next_path'])
+
+
+class FollowTimelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Follower')
+        cls.author = User.objects.create_user(username='Author')
+        cls.old_post = Post.objects.create(
+            author=cls.author,
+            text='Пост, написанный до подписки',
+        )
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def follow_feed(self):
+        response = self.authorized_client.get(reverse('posts:follow_index'))
+        return list(response.context['page_obj'])
+
+    def test_timeline_is_filled_on_write(self):
+        """Подписка и новые посты раскладываются в ленту подписчика."""
+        Follow.objects.create(user=self.user, author=self.author)
+        new_post = Post.objects.create(
+            author=self.author,
+            text='Пост, написанный после подписки',
+        )
+        self.assertEqual(
+            set(self.user.timeline.values_list('post', flat=True)),
+            {self.old_post.pk, new_post.pk},
+        )
+        self.assertEqual(self.follow_feed(), [new_post, self.old_post])
+        Follow.objects.filter(user=self.user, author=self.author).delete()
+        self.assertFalse(self.user.timeline.exists())
+        self.assertEqual(self.follow_feed(), [])
+
+    @override_settings(POSTS_TIMELINE_FANOUT_LIMIT=0)
+    def test_popular_author_is_read_on_demand(self):
+        """Посты популярных авторов подмешиваются в ленту при чтении."""
+        Follow.objects.create(user=self.user, author=self.author)
+        new_post = Post.objects.create(
+            author=self.author,
+            text='Пост популярного автора',
+        )
+        self.assertFalse(self.user.timeline.exists())
+        self.assertEqual(self.follow_feed(), [new_post, self.old_post])
+
+    @override_settings(POSTS_TIMELINE_FANOUT_LIMIT=1)
+    def test_posts_survive_fan_out_switch(self):
+        """Посты, написанные без раскладки, не пропадают после нее."""
+        other = User.objects.create_user(username='Other')
+        Follow.objects.create(user=other, author=self.author)
+        Follow.objects.create(user=self.user, author=self.author)
+        popular_post = Post.objects.create(
+            author=self.author,
+            text='Пост, пока у автора два подписчика',
+        )
+        expected = [popular_post, self.old_post]
+        self.assertEqual(self.follow_feed(), expected)
+
+        Follow.objects.filter(user=other).delete()
+        self.assertEqual(self.follow_feed(), expected)
+        call_command('run_jobs', '--once', stdout=StringIO())
+        self.assertEqual(
+            set(self.user.timeline.values_list('post', flat=True)),
+            {popular_post.pk, self.old_post.pk},
+        )
+        self.assertEqual(self.follow_feed(), expected)
+
+    @override_settings(POSTS_TIMELINE_FANOUT_LIMIT=0)
+    def test_mixed_feed_pages_by_cursor(self):
+        """Лента из двух веток листается курсором без пропусков."""
+        fanned_author = User.objects.create_user(username='Fanned')
+        Follow.objects.create(user=self.user, author=self.author)
+        with self.settings(POSTS_TIMELINE_FANOUT_LIMIT=10):
+            Follow.objects.create(user=self.user, author=fanned_author)
+        posts = [self.old_post] + [
+            Post.objects.create(
+                author=(self.author, fanned_author)[number % 2],
+                text=f'Пост {number}',
+            )
+            for number in range(POSTS_AMOUNT + 3)
+        ]
+        seen, cursor = [], ''
+        while cursor is not None:
+            response = self.authorized_client.get(
+                reverse('posts:follow_index'), {'cursor': cursor},
+            )
+            page_obj = response.context['page_obj']
+            seen += list(page_obj)
+            cursor = page_obj.next_cursor
+        self.assertEqual(seen, posts[::-1])
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Тестовый пост',
+            group=cls.group,
+        )
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_posts', args=(cls.group.slug,)),
+            reverse('posts:profile', args=(cls.author.username,)),
+            reverse('posts:post_detail', args=(cls.post.pk,)),
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_anonymous_pages_revalidate(self):
+        """Анонимы получают 304, пока в ленте ничего не изменилось."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertIn('public', response['Cache-Control'])
+                self.assertEqual(
+                    'Last-Modified' in response, url != self.urls[-1],
+                )
+                response = self.client.get(
+                    url, HTTP_IF_NONE_MATCH=response['ETag'],
+                )
+                self.assertEqual(
+                    response.status_code, HTTPStatus.NOT_MODIFIED,
+                )
+
+    def test_changes_invalidate_etag(self):
+        etags = {url: self.client.get(url)['ETag'] for url in self.urls}
+        Comment.objects.create(
+            post=self.post, author=self.author, text='Комментарий',
+        )
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_post_edit_and_group_change_invalidate_post_etag(self):
+        """Правка поста и его группы меняют ETag страницы поста."""
+        url = self.urls[-1]
+        etag = self.client.get(url)['ETag']
+        self.group.title = 'Новое название группы'
+        self.group.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.post.text = 'Исправленный текст'
+        self.post.save()
+        response = self.client.get(
+            url,
+            HTTP_IF_NONE_MATCH=response['ETag'],
+            HTTP_IF_MODIFIED_SINCE='Mon, 01 Jan 2024 00:00:00 GMT',
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_user_pages_are_private(self):
+        """Страница пользователя не совпадает со страницей анонима."""
+        url = reverse('posts:index')
+        anonymous_etag = self.client.get(url)['ETag']
+        self.client.force_login(self.author)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=anonymous_etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertIn('private', response['Cache-Control'])
+
+
+@override_settings(POSTS_PAGE_CACHE=True)
+class AnonymousPageCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.post = Post.objects.create(author=cls.author, text='Первый пост')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_page_served_without_view(self):
+        """Повторный анонимный запрос не вызывает представление."""
+        url = reverse('posts:index')
+        first = self.client.get(url)
+        self.assertIsNotNone(first.context)
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertIsNone(second.context)
+        self.assertEqual(second.content, first.content)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_new_post_refreshes_page(self):
+        url = reverse('posts:profile', args=(self.author.username,))
+        self.client.get(url)
+        Post.objects.create(author=self.author, text='Второй пост')
+        response = self.client.get(url)
+        self.assertIsNotNone(response.context)
+        self.assertContains(response, 'Второй пост')
+
+    def test_api_responses_not_cached(self):
+        """JSON с ETag API не попадает в кэш страниц."""
+        url = reverse('api:v1:posts')
+        self.assertEqual(self.client.get(url).status_code, HTTPStatus.OK)
+        self.assertIsNone(
+            cache.get(page_cache.page_key(RequestFactory().get(url))),
+        )
+
+    def test_logged_in_users_bypass_cache(self):
+        url = reverse('posts:index')
+        self.client.get(url)
+        self.client.force_login(self.author)
+        response = self.client.get(url)
+        self.assertIsNotNone(response.context)
+        self.assertContains(response, self.author.username)
+
+    def test_csrf_token_substituted(self):
+        """CSRF-токен не попадает в кэш и подставляется каждому свой."""
+        request = RequestFactory().get('/')
+        request.META['CSRF_COOKIE_USED'] = True
+        response = HttpResponse(
+            '<input type="hidden" name="csrfmiddlewaretoken" value="abc123">'
+        )
+        cached = page_cache._with_placeholders(request, response)
+        self.assertNotIn(b'abc123', cached.content)
+        self.assertIn(b'abc123', response.content)
+        filled = page_cache._filled(RequestFactory().get('/'), cached)
+        self.assertNotIn(page_cache.CSRF_PLACEHOLDER, filled.content)
@@ -0,0 +1,128 @@
+"""Фоновая генерация миниатюр картинок постов.
+
+Сохранение поста с новой картинкой (сигналы в posts.signals) только
+помечает его как ожидающий миниатюру и ставит задачу
+posts.tasks.generate_thumbnail в очередь, а саму картинку режет воркер
+run_jobs; команда generate_thumbnails доделывает пропущенные посты.
+Шаблоны берут готовые адреса из полей thumbnail* поста и никогда не
+трогают Pillow.
+
+Кроме основной миниатюры 960x339 делаются варианты нескольких ширин
+в JPEG, WebP и, если его поддерживают Pillow и sorl, AVIF — для
+srcset, чтобы телефоны не качали картинку для десктопа.
+"""
+import logging
+
+from PIL import Image, UnidentifiedImageError, features
+from sorl.thumbnail import get_thumbnail
+from sorl.thumbnail.base import EXTENSIONS
+
+from . import feed_cache
+from .models import Post
+
+THUMBNAIL_WIDTH = 960
+THUMBNAIL_HEIGHT = 339
+THUMBNAIL_GEOMETRY = f'{THUMBNAIL_WIDTH}x{THUMBNAIL_HEIGHT}'
+THUMBNAIL_OPTIONS = {'crop': 'center', 'upscale': True}
+VARIANT_WIDTHS = (480, 960, 1440)
+VARIANT_QUALITY = 80
+
+
+def _format_supported(name):
+    feature = name.lower()
+    return name in EXTENSIONS and (
+        feature in features.modules and features.check_module(feature)
+        or feature in features.codecs and features.check_codec(feature)
+    )
+
+
+VARIANT_FORMATS = {
+    'JPEG': 'thumbnail_srcset',
+    'WEBP': 'thumbnail_webp_srcset',
+    'AVIF': 'thumbnail_avif_srcset',
+}
+SUPPORTED_FORMATS = [
+    name for name in VARIANT_FORMATS
+    if name == 'JPEG' or _format_supported(name)
+]
+
+logger = logging.getLogger('yatube.thumbnails')
+
+
+def mark_pending(post):
+    """Сбросить миниатюры поста, у которого сменилась картинка."""
+    post.thumbnail = ''
+    for field in VARIANT_FORMATS.values():
+        setattr(post, field, '')
+    post.thumbnail_pending = bool(post.image)
+
+
+def _variant_widths(image):
+    """Ширины вариантов; больше исходной картинки растягивать незачем."""
+    return [
+        width for width in VARIANT_WIDTHS
+        if width <= THUMBNAIL_WIDTH or width <= image.width
+    ]
+
+
+def _srcset(image, widths, format_):
+    return ', '.join(
+        '{} {}w'.format(
+            get_thumbnail(
+                image,
+                f'{width}x{round(width * THUMBNAIL_HEIGHT / THUMBNAIL_WIDTH)}',
+                format=format_,
+                quality=VARIANT_QUALITY,
+                **THUMBNAIL_OPTIONS,
+            ).url,
+            width,
+        )
+        for width in widths
+    )
+
+
+def _readable(image):
+    """Читает ли Pillow картинку; если нет, повторять незачем."""
+    image.open('rb')
+    try:
+        Image.open(image).verify()
+    except (UnidentifiedImageError, Image.DecompressionBombError,
+            SyntaxError):
+        return False
+    finally:
+        image.close()
+    return True
+
+
+def generate(post):
+    """Сделать миниатюры и сохранить их адреса в посте.
+
+    Временные ошибки хранилища и Pillow пробрасываются, пост остается
+    ожидающим, и очередь повторит задачу. Нечитаемая картинка снимает
+    ожидание сразу: миниатюр у такого поста не будет.
+    """
+    fields = {'thumbnail': ''}
+    fields.update((field, '') for field in VARIANT_FORMATS.values())
+    if _readable(post.image):
+        fields['thumbnail'] = get_thumbnail(
+            post.image, THUMBNAIL_GEOMETRY, **THUMBNAIL_OPTIONS
+        ).url
+        widths = _variant_widths(post.image)
+        for format_ in SUPPORTED_FORMATS:
+            fields[VARIANT_FORMATS[format_]] = _srcset(
+                post.image, widths, format_,
+            )
+    else:
+        logger.warning('Картинку поста %s не прочитать', post.pk)
+    # Картинку могли сменить, пока резали старую.
+    updated = Post.objects.filter(pk=post.pk, image=post.image.name).update(
+        thumbnail_pending=False,
+        **fields,
+    )
+    if updated:
+        feed_cache.bump(*feed_cache.post_feeds(post.author_id, post.group_id))
+    return fields['thumbnail']
+
+
+def pending_posts():
+    return Post.objects.filter(thumbnail_pending=True).order_by('pk')
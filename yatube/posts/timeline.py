@@ -0,0 +1,225 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+
+from .models import Follow, Post, Profile, TimelineEntry
+
+FANOUT_BATCH_SIZE = 1000
+TIMELINE_ORDERING = ('-timeline_created', '-timeline_post')
+
+
+def is_fanned_out(author_id):
+    """Посты автора раскладываются по лентам подписчиков при записи.
+
+    У авторов с огромным числом подписчиков запись стала бы слишком
+    дорогой, поэтому их посты подмешиваются в ленту при чтении. Режим
+    хранится в профиле и меняется только вместе с раскладкой, иначе
+    посты, не разложенные в одном режиме, пропали бы из лент в другом.
+    """
+    fanned_out = Profile.objects.filter(user_id=author_id).values_list(
+        'timeline_fanned_out', flat=True,
+    ).first()
+    return fanned_out is None or fanned_out
+
+
+def update_fan_out(author_id):
+    """Сменить режим автора после подписки или отписки.
+
+    Перешедшего за POSTS_TIMELINE_FANOUT_LIMIT автора сразу переводит
+    на чтение при записи. Вернуть раскладку дороже, это делает задача
+    resume_fan_out; функция возвращает True, если ее пора поставить.
+    """
+    profiles = Profile.objects.filter(user_id=author_id)
+    limit = settings.POSTS_TIMELINE_FANOUT_LIMIT
+    profiles.filter(
+        timeline_fanned_out=True, followers_count__gt=limit,
+    ).update(timeline_fanned_out=False)
+    return profiles.filter(
+        timeline_fanned_out=False, followers_count__lte=limit,
+    ).exists()
+
+
+def resume_fan_out(author_id):
+    """Разложить посты автора всем подписчикам и вернуть ему раскладку.
+
+    Подписчикам, в том числе подписавшимся, пока раскладки не было,
+    добавляются последние POSTS_TIMELINE_BACKFILL постов автора. До
+    коммита лента читает автора по-старому, так что посты не пропадают.
+    """
+    with transaction.atomic():
+        resumed = Profile.objects.filter(
+            user_id=author_id,
+            timeline_fanned_out=False,
+            followers_count__lte=settings.POSTS_TIMELINE_FANOUT_LIMIT,
+        ).update(timeline_fanned_out=True)
+        if resumed:
+            backfill_all(author_id=author_id)
+    return bool(resumed)
+
+
+def pause_popular_authors():
+    """Снять раскладку с авторов, у которых подписчиков больше лимита.
+
+    Нужно после пересчета счетчиков в обход сигналов подписок.
+    """
+    return Profile.objects.filter(
+        timeline_fanned_out=True,
+        followers_count__gt=settings.POSTS_TIMELINE_FANOUT_LIMIT,
+    ).update(timeline_fanned_out=False)
+
+
+def _bulk_insert(entries):
+    batch = []
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) >= FANOUT_BATCH_SIZE:
+            TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def fan_out_post(post):
+    """Разложить новый пост по лентам всех подписчиков автора."""
+    if not is_fanned_out(post.author_id):
+        return
+    follower_ids = Follow.objects.filter(
+        author_id=post.author_id,
+    ).values_list('user_id', flat=True)
+    _bulk_insert(
+        TimelineEntry(user_id=user_id, post_id=post.pk, created=post.created)
+        for user_id in follower_ids.iterator()
+    )
+
+
+def backfill(follow):
+    """Добавить в ленту нового подписчика последние посты автора."""
+    if not is_fanned_out(follow.author_id):
+        return
+    posts = Post.objects.filter(
+        author_id=follow.author_id,
+    ).values_list('pk', 'created')[:settings.POSTS_TIMELINE_BACKFILL]
+    _bulk_insert(
+        TimelineEntry(user_id=follow.user_id, post_id=post_id, created=created)
+        for post_id, created in posts
+    )
+
+
+def backfill_all(first_follow_id=0, author_id=None):
+    """Дополнить ленты по всем подпискам с id не меньше first_follow_id.
+
+    Делает то же, что backfill для каждой подписки, но одним INSERT ...
+    SELECT: нужен после массовой загрузки, которая обходит сигналы, и
+    когда автору возвращают раскладку (тогда только по его подпискам).
+    """
+    ops = connection.ops
+    params = []
+    author_filter = ''
+    if author_id is not None:
+        author_filter = 'WHERE author_id = %s '
+        params.append(author_id)
+    sql = (
+        f'{ops.insert_statement(ignore_conflicts=True)} '
+        f'{TimelineEntry._meta.db_table} (user_id, post_id, created) '
+        f'SELECT follow.user_id, post.id, post.created '
+        f'FROM {Follow._meta.db_table} follow '
+        f'JOIN {Profile._meta.db_table} profile '
+        f'ON profile.user_id = follow.author_id '
+        f'JOIN (SELECT id, author_id, created, ROW_NUMBER() OVER ('
+        f'PARTITION BY author_id ORDER BY created DESC, id DESC) AS position '
+        f'FROM {Post._meta.db_table} {author_filter}) post '
+        f'ON post.author_id = follow.author_id '
+        f'WHERE follow.id >= %s AND post.position <= %s '
+        f'AND profile.timeline_fanned_out = %s '
+        f'{ops.ignore_conflicts_suffix_sql(ignore_conflicts=True)}'
+    )
+    params += [first_follow_id, settings.POSTS_TIMELINE_BACKFILL, True]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+def drop(follow):
+    """Убрать из ленты посты автора, от которого отписались."""
+    TimelineEntry.objects.filter(
+        user_id=follow.user_id,
+        post__author_id=follow.author_id,
+    ).delete()
+
+
+class TimelineUnion:
+    """Лента из нескольких упорядоченных веток, объединенных UNION ALL.
+
+    Каждая ветка сортируется по своему индексу, поэтому база сливает
+    их и останавливается на LIMIT. Фильтры (в том числе курсор
+    пагинатора), select_related и only применяются к каждой ветке, а
+    сортировка, срезы и count — к объединению.
+    """
+
+    def __init__(self, branches):
+        self.branches = branches
+
+    def _each(self, method, *args, **kwargs):
+        return TimelineUnion([
+            getattr(branch, method)(*args, **kwargs)
+            for branch in self.branches
+        ])
+
+    def filter(self, *args, **kwargs):
+        return self._each('filter', *args, **kwargs)
+
+    def exclude(self, *args, **kwargs):
+        return self._each('exclude', *args, **kwargs)
+
+    def select_related(self, *fields):
+        return self._each('select_related', *fields)
+
+    def only(self, *fields):
+        return self._each('only', *fields)
+
+    def combined(self):
+        first, *rest = self.branches
+        return first.union(*rest, all=True).order_by(*TIMELINE_ORDERING)
+
+    def __getattr__(self, name):
+        return getattr(self.combined(), name)
+
+    def __getitem__(self, index):
+        return self.combined()[index]
+
+    def __iter__(self):
+        return iter(self.combined())
+
+    def __len__(self):
+        return len(self.combined())
+
+    def __bool__(self):
+        return bool(self.combined())
+
+
+def timeline_posts(user):
+    """Посты ленты подписок пользователя.
+
+    Обычно это чтение его записей TimelineEntry по индексу
+    timeline_user_created_idx; посты авторов, которые не раскладываются
+    при записи, добавляются к ним веткой по post_author_created_idx.
+    """
+    unfanned_author_ids = list(
+        Follow.objects.filter(
+            user=user, author__profile__timeline_fanned_out=False,
+        ).values_list('author_id', flat=True)
+    )
+    fanned = Post.objects.filter(timeline_entries__user=user).annotate(
+        timeline_created=F('timeline_entries__created'),
+        timeline_post=F('timeline_entries__post'),
+    )
+    if not unfanned_author_ids:
+        return fanned.order_by(*TIMELINE_ORDERING)
+    # Записи, разложенные до того, как автор стал популярным, уже есть
+    # во второй ветке.
+    fanned = fanned.exclude(author_id__in=unfanned_author_ids)
+    merged = Post.objects.filter(author_id__in=unfanned_author_ids).annotate(
+        timeline_created=F('created'),
+        timeline_post=F('pk'),
+    )
+    return TimelineUnion([fanned.order_by(), merged.order_by()])
@@ -1,26 +1,73 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
+from django.http import Http404
 from django.shortcuts import get_object_or_404, render, redirect
-
-from .forms import CommentForm, PostForm
+from django.utils.http import urlencode
+
+from core.db_router import replica_reads
+from core.query_budget import query_budget
+
+from . import feed_cache
+from .comments import comment_order, comments_page, thread_replies
+from .conditional import (
+    conditional_page, group_state, index_state, post_state, profile_state,
+)
+from .counters import get_profile
+from .forms import CommentForm, PostForm, ReplyForm
+from .images import limit_image_upload
 from .models import Follow, Group, Post, User
+from .paginators import CursorPaginator
+from .search import search_posts
+from .timeline import timeline_posts
 
 POSTS_AMOUNT = 10
 
 
-def index(request):
-    template = 'posts/index.html'
-    post_list = Post.objects.all()
+def paginate(request, post_list):
+    """Страница ленты: по номеру или по курсору, если он включен."""
+    if settings.POSTS_CURSOR_PAGINATION or 'cursor' in request.GET:
+        paginator = CursorPaginator(post_list, POSTS_AMOUNT)
+        return paginator.get_page(request.GET.get('cursor'))
     paginator = Paginator(post_list, POSTS_AMOUNT)
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    return paginator.get_page(page_number)
+
+
+@replica_reads
+@query_budget(6)
+@conditional_page(index_state)
+def index(request):
+    template = 'posts/index.html'
+    post_list = Post.objects.select_related('author', 'group')
+    page_obj = paginate(request, post_list)
     context = {
         'page_obj': page_obj,
+        **feed_cache.context(feed_cache.INDEX),
+    }
+    return render(request, template, context)
+
+
+@query_budget(5)
+def post_search(request):
+    template = 'posts/search.html'
+    query = request.GET.get('q', '').strip()
+    results = search_posts(
+        query, Post.objects.select_related('author', 'group'),
+    )
+    page_obj = Paginator(results, POSTS_AMOUNT).get_page(
+        request.GET.get('page')
+    )
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+        'page_query': urlencode({'q': query}) + '&',
     }
     return render(request, template, context)
 
 
 @login_required
+@limit_image_upload
 def post_create(request):
     template_name = 'posts/create_post.html'
     form = PostForm(
@@ -28,14 +75,15 @@ def post_create(request):
         files=request.FILES or None,
     )
     if form.is_valid():
-        form = form.save(commit=False)
-        form.author = request.user
-        form.save()
-        return redirect('posts:profile', username=form.author.username)
+        post = form.save(commit=False)
+        post.author = request.user
+        post.save()
+        return redirect('posts:profile', username=post.author.username)
     return render(request, template_name, {'form': form})
 
 
 @login_required
+@limit_image_upload
 def post_edit(request, post_id):
     template_name = 'posts/create_post.html'
     post = get_object_or_404(Post, pk=post_id)
@@ -47,7 +95,7 @@ def post_edit(request, post_id):
         instance=post,
     )
     if form.is_valid():
-        form.save()
+        post = form.save()
         return redirect('posts:post_detail', post_id=post.pk)
     return render(request, template_name, {'form': form, 'is_edit': True})
 
@@ -55,7 +103,10 @@ def post_edit(request, post_id):
 @login_required
 def add_comment(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
-    form = CommentForm(request.POST or None)
+    if request.POST.get('parent'):
+        form = ReplyForm(request.POST, post=post)
+    else:
+        form = CommentForm(request.POST or None)
     if form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
@@ -64,15 +115,20 @@ def add_comment(request, post_id):
     return redirect('posts:post_detail', post_id=post_id)
 
 
+@replica_reads
+@query_budget(6)
 @login_required
 def follow_index(request):
     template = 'posts/follow.html'
-    post_list = Post.objects.filter(author__following__user=request.user)
-    paginator = Paginator(post_list, POSTS_AMOUNT)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    post_list = timeline_posts(request.user).select_related(
+        'author', 'group',
+    )
+    page_obj = paginate(request, post_list)
     context = {
         'page_obj': page_obj,
+        **feed_cache.context(
+            feed_cache.follow(request.user.pk), feed_cache.INDEX,
+        ),
     }
     return render(request, template, context)
 
@@ -93,25 +149,34 @@ def profile_unfollow(request, username):
     return redirect('posts:profile', username=username)
 
 
+@replica_reads
+@query_budget(8)
+@conditional_page(group_state)
 def group_posts(request, slug):
     template = 'posts/group_list.html'
     group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all()
-    paginator = Paginator(post_list, POSTS_AMOUNT)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    post_list = group.posts.select_related('author', 'group')
+    page_obj = paginate(request, post_list)
     context = {
         'group': group,
         'page_obj': page_obj,
+        **feed_cache.context(feed_cache.group(group.pk)),
     }
     return render(request, template, context)
 
 
+@replica_reads
+@query_budget(6)
+@conditional_page(post_state)
 def post_detail(request, post_id):
     template_name = 'posts/post_detail.html'
-    post = get_object_or_404(Post, pk=post_id)
-    posts_amount = Post.objects.filter(author=post.author).count()
-    comments = post.comments.all()
+    post = get_object_or_404(
+        Post.objects.select_related('author__profile', 'group'),
+        pk=post_id,
+    )
+    posts_amount = get_profile(post.author).posts_count
+    order = comment_order(request)
+    comments = comments_page(post.pk, order, request.GET.get('cursor'))
     comment_form = CommentForm()
     context = {
         'author': post.author,
@@ -119,25 +184,61 @@ def post_detail(request, post_id):
         'posts_amount': posts_amount,
         'group': post.group,
         'comments': comments,
+        'comment_order': order,
         'comment_form': comment_form,
     }
     return render(request, template_name, context)
 
 
+@replica_reads
+@query_budget(3)
+def post_comments(request, post_id):
+    """Следующая порция комментариев или ответов одной ветки."""
+    template_name = 'posts/includes/comment_list.html'
+    post = get_object_or_404(Post.objects.only('pk'), pk=post_id)
+    thread = request.GET.get('thread')
+    if thread is not None:
+        if not thread.isdigit():
+            raise Http404
+        replies, next_path = thread_replies(
+            post.pk, int(thread), request.GET.get('after', ''),
+        )
+        context = {
+            'post': post,
+            'replies': replies,
+            'thread': thread,
+            'next_path': next_path,
+        }
+        return render(request, 'posts/includes/comment_replies.html', context)
+    order = comment_order(request)
+    context = {
+        'post': post,
+        'comments': comments_page(post.pk, order, request.GET.get('cursor')),
+        'comment_order': order,
+    }
+    return render(request, template_name, context)
+
+
+@replica_reads
+@query_budget(9)
+@conditional_page(profile_state)
 def profile(request, username):
     template_name = 'posts/profile.html'
-    author = get_object_or_404(User, username=username)
-    post_list = author.posts.all()
-    posts_amount = post_list.count()
-    paginator = Paginator(post_list, POSTS_AMOUNT)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    author = get_object_or_404(
+        User.objects.select_related('profile'),
+        username=username,
+    )
+    author_profile = get_profile(author)
+    post_list = author.posts.select_related('author', 'group')
+    page_obj = paginate(request, post_list)
     following = request.user.is_authenticated and Follow.objects.filter(
         user=request.user, author=author).exists()
     context = {
         'author': author,
+        'profile': author_profile,
         'page_obj': page_obj,
-        'posts_amount': posts_amount,
+        'posts_amount': author_profile.posts_count,
         'following': following,
+        **feed_cache.context(feed_cache.profile(author.pk)),
     }
     return render(request, template_name, context)
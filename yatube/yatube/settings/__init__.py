@@ -0,0 +1,19 @@
+"""Settings profile is chosen by YATUBE_ENV: dev (default), prod or bench.
+
+DJANGO_SETTINGS_MODULE may also point at a profile module directly,
+e.g. yatube.settings.prod.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+ENVIRONMENT = os.environ.get('YATUBE_ENV', 'dev')
+
+if ENVIRONMENT == 'dev':
+    from .dev import *  # noqa: F401,F403
+elif ENVIRONMENT == 'prod':
+    from .prod import *  # noqa: F401,F403
+elif ENVIRONMENT == 'bench':
+    from .bench import *  # noqa: F401,F403
+else:
+    raise ImproperlyConfigured(f'Unknown YATUBE_ENV: {ENVIRONMENT}')
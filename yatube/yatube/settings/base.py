@@ -0,0 +1,363 @@
+"""Settings shared by all profiles; the profile modules override them.
+
+Values that differ between deployments are read from YATUBE_*
+environment variables.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+BASE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+
+def env(name, default=None):
+    return os.environ.get(f'YATUBE_{name}', default)
+
+
+def env_bool(name, default=False):
+    value = env(name)
+    if value is None:
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+def env_int(name, default):
+    value = env(name)
+    return default if value is None else int(value)
+
+
+def env_list(name, default):
+    value = env(name)
+    if value is None:
+        return default
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def env_required(name):
+    value = env(name)
+    if not value:
+        raise ImproperlyConfigured(f'Set the YATUBE_{name} variable')
+    return value
+
+
+SECRET_KEY = env(
+    'SECRET_KEY', '=0*z!8d1!qwvd0+2v1tcpc92dw+8mlq4xf1*mfl3edx5n=18db',
+)
+
+DEBUG = False
+
+ALLOWED_HOSTS = env_list('ALLOWED_HOSTS', [
+    'localhost',
+    '127.0.0.1',
+    '[::1]',
+    'testserver',
+])
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'core.apps.CoreConfig',
+    'posts.apps.PostsConfig',
+    'users.apps.UsersConfig',
+    'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
+    'jobs.apps.JobsConfig',
+    'notifications.apps.NotificationsConfig',
+    'sorl.thumbnail',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'core.db_router.ReplicaRoutingMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'posts.page_cache.AnonymousPageCacheMiddleware',
+    'core.template_profiling.TemplateProfilingMiddleware',
+    'core.query_budget.QueryBudgetMiddleware',
+]
+
+ROOT_URLCONF = 'yatube.urls'
+
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+
+
+def template_loaders(cached):
+    """Parsed templates are kept in memory by the cached loader."""
+    loaders = [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]
+    if cached:
+        return [('django.template.loaders.cached.Loader', loaders)]
+    return loaders
+
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'OPTIONS': {
+            'loaders': template_loaders(env_bool('TEMPLATE_CACHE', True)),
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.year.year',
+                'notifications.context_processors.unread_notifications',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+
+
+# Database
+
+# YATUBE_DB_ENGINE=postgres switches to PostgreSQL (needs psycopg2).
+# Connections are persistent (CONN_MAX_AGE); for pooling across workers
+# put PgBouncer in front and set YATUBE_DB_PGBOUNCER=1, which turns off
+# server-side cursors that transaction pooling cannot keep.
+# With YATUBE_DB_REPLICA_HOST (or YATUBE_DB_REPLICA_NAME for SQLite)
+# feed reads go to the replica, see core.db_router.
+
+
+def database_settings(host=None, name=None):
+    if env('DB_ENGINE', 'sqlite') == 'postgres':
+        return {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': name or env('DB_NAME', 'yatube'),
+            'USER': env('DB_USER', 'yatube'),
+            'PASSWORD': env('DB_PASSWORD', ''),
+            'HOST': host or env('DB_HOST', 'localhost'),
+            'PORT': env('DB_PORT', '5432'),
+            'CONN_MAX_AGE': env_int('CONN_MAX_AGE', 60),
+            'DISABLE_SERVER_SIDE_CURSORS': env_bool('DB_PGBOUNCER'),
+        }
+    return {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': name or env('DB_NAME', os.path.join(BASE_DIR, 'db.sqlite3')),
+        'CONN_MAX_AGE': env_int('CONN_MAX_AGE', 60),
+    }
+
+
+DATABASES = {
+    'default': database_settings(),
+}
+if env('DB_REPLICA_HOST') or env('DB_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        **database_settings(
+            host=env('DB_REPLICA_HOST'), name=env('DB_REPLICA_NAME'),
+        ),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['core.db_router.PrimaryReplicaRouter']
+# WAL, busy timeout and larger caches for every new SQLite connection,
+# see core.sqlite; YATUBE_SQLITE_TUNING=0 keeps SQLite defaults
+SQLITE_TUNING = env_bool('SQLITE_TUNING', True)
+# Seconds a client that has just written keeps reading from the primary
+DATABASE_REPLICA_STICKINESS = env_int('DB_REPLICA_STICKINESS', 10)
+
+
+# Password validation
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+
+LANGUAGE_CODE = 'ru'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+
+STATIC_URL = env('STATIC_URL', '/static/')
+STATIC_ROOT = env('STATIC_ROOT', os.path.join(BASE_DIR, 'static_root'))
+
+STATICFILES_DIRS = [
+    os.path.join(BASE_DIR, 'static'),
+]
+
+# Point MEDIA_URL at a CDN or the web server; Django serves media only
+# under DEBUG
+MEDIA_URL = env('MEDIA_URL', '/media/')
+MEDIA_ROOT = env('MEDIA_ROOT', os.path.join(BASE_DIR, 'media'))
+
+# Auth settings
+
+LOGIN_URL = 'users:login'
+LOGIN_REDIRECT_URL = 'posts:index'
+
+# Sessions are read from the cache and written through to the database
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+
+# Email settings
+
+# Requests only queue email; the run_jobs worker delivers it in batches
+# through EMAIL_DELIVERY_BACKEND, reusing one connection per batch
+EMAIL_BACKEND = 'jobs.mail.QueuedEmailBackend'
+EMAIL_DELIVERY_BACKEND = env(
+    'EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend',
+)
+EMAIL_BATCH_SIZE = 100
+# Absolute links in emails sent outside of a request
+SITE_URL = env('SITE_URL', 'http://localhost:8000')
+EMAIL_HOST = env('EMAIL_HOST', 'localhost')
+EMAIL_PORT = env_int('EMAIL_PORT', 25)
+EMAIL_HOST_USER = env('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = env('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = env_bool('EMAIL_USE_TLS')
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+
+CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
+
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'yatube': {
+            'handlers': ['console'],
+            'level': env('LOG_LEVEL', 'WARNING'),
+        },
+    },
+}
+
+
+# Query budgets set by core.query_budget.query_budget on views
+QUERY_BUDGET_ENABLED = False
+# Raise instead of logging a warning when a view exceeds its budget
+QUERY_BUDGET_STRICT = False
+
+
+# Per-template render time in the Server-Timing header and the
+# yatube.template_profiling log (self time, slowest first)
+TEMPLATE_PROFILING = env_bool('TEMPLATE_PROFILING')
+TEMPLATE_PROFILING_LIMIT = 20
+
+
+# Cache
+# LocMemCache is per process; with several workers use a shared backend:
+# YATUBE_CACHE_BACKEND=file|memcached|redis and YATUBE_CACHE_LOCATION.
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', ''),
+    'file': (
+        'django.core.cache.backends.filebased.FileBasedCache',
+        os.path.join(BASE_DIR, 'cache'),
+    ),
+    'memcached': (
+        'django.core.cache.backends.memcached.MemcachedCache',
+        '127.0.0.1:11211',
+    ),
+    'redis': ('django_redis.cache.RedisCache', 'redis://127.0.0.1:6379/1'),
+}
+
+
+def cache_settings(default_backend):
+    backend, location = CACHE_BACKENDS[env('CACHE_BACKEND', default_backend)]
+    return {
+        'default': {
+            'BACKEND': backend,
+            'LOCATION': env('CACHE_LOCATION', location),
+        }
+    }
+
+
+CACHES = cache_settings('locmem')
+# Only one worker recomputes an expiring entry, holding this lock
+CACHE_RECOMPUTE_LOCK_TIMEOUT = 10
+# How long an expired entry may still be served while it is recomputed
+CACHE_STALE_TIMEOUT = 60
+
+
+# Posts
+
+# Keyset pagination for feeds instead of page numbers (no COUNT, no OFFSET)
+POSTS_CURSOR_PAGINATION = False
+
+# Authors with more followers are merged into follow feeds on read
+POSTS_TIMELINE_FANOUT_LIMIT = 10000
+# How many recent posts a new follower gets copied into their feed
+POSTS_TIMELINE_BACKFILL = 1000
+
+# Feed fragments are invalidated by version bumps, so they may live long
+POSTS_FEED_CACHE_TIMEOUT = 60 * 60 * 24
+
+# max-age of feed and post pages for anonymous visitors; with 0 browsers
+# and proxies revalidate every time and get 304 until something changes
+POSTS_PAGE_CACHE_MAX_AGE = 0
+
+# Serve whole feed and post pages to anonymous visitors from the cache;
+# entries are checked against feed versions, the timeout only frees memory
+POSTS_PAGE_CACHE = False
+POSTS_PAGE_CACHE_TIMEOUT = 60 * 60
+
+# Background job queue (jobs app), run by the run_jobs management command;
+# with JOBS_EAGER tasks run inline in the request instead of being queued
+JOBS_EAGER = env_bool('JOBS_EAGER')
+JOBS_MAX_ATTEMPTS = 5
+# Retry delay doubles after every failure, up to the maximum, in seconds
+JOBS_RETRY_DELAY = 10
+JOBS_RETRY_MAX_DELAY = 60 * 60
+# A job still running after this many seconds is assumed to have lost
+# its worker and is handed to another one
+JOBS_LEASE_TIMEOUT = 10 * 60
+
+# Follower notifications: written in chunks of NOTIFICATIONS_BATCH_SIZE by
+# the job worker, collected into one digest email per recipient every
+# NOTIFICATIONS_DIGEST_INTERVAL seconds
+NOTIFICATIONS_BATCH_SIZE = 1000
+NOTIFICATIONS_DIGEST_INTERVAL = env_int('DIGEST_INTERVAL', 60 * 60)
+NOTIFICATIONS_DIGEST_POSTS = 10
+# The cached unread counter is dropped on change; the timeout only bounds
+# staleness after posts with notifications are deleted
+NOTIFICATIONS_UNREAD_TIMEOUT = 5 * 60
+
+# Limits for uploaded post images; larger originals are downsized
+POSTS_IMAGE_MAX_BYTES = 10 * 1024 * 1024
+POSTS_IMAGE_MAX_PIXELS = 50_000_000
+POSTS_IMAGE_MAX_SIDE = 2560
+
+# Full-text search: 'fts5' (SQLite FTS5), 'inverted' (SearchTerm table, any
+# database) or 'auto' to use FTS5 when the SQLite build has it
+POSTS_SEARCH_BACKEND = 'auto'
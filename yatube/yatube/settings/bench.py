@@ -0,0 +1,24 @@
+"""Benchmarks: production code paths on a single local machine.
+
+DEBUG stays off so connection.queries is not collected, but the secret
+key, hosts and cache do not need any infrastructure.
+"""
+import os
+
+os.environ.setdefault('YATUBE_SECRET_KEY', 'bench-only-secret-key')
+
+from .prod import *  # noqa: E402,F401,F403
+from .base import cache_settings, env_bool, env_list  # noqa: E402
+
+ALLOWED_HOSTS = env_list(
+    'ALLOWED_HOSTS', ['localhost', '127.0.0.1', 'testserver'],
+)
+
+CACHES = cache_settings('locmem')
+STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
+
+SESSION_COOKIE_SECURE = False
+CSRF_COOKIE_SECURE = False
+
+POSTS_PAGE_CACHE = env_bool('PAGE_CACHE', False)
+EMAIL_DELIVERY_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
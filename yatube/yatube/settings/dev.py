@@ -0,0 +1,21 @@
+"""Local development: DEBUG, templates reread on change, local services."""
+from .base import *  # noqa: F401,F403
+from .base import (
+    DATABASES, TEMPLATES, env, env_bool, env_int, template_loaders,
+)
+
+DEBUG = True
+
+TEMPLATES[0]['OPTIONS']['loaders'] = template_loaders(
+    env_bool('TEMPLATE_CACHE', False),
+)
+
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = env_int('CONN_MAX_AGE', 0)
+
+# Letters go to EMAIL_FILE_PATH unless YATUBE_EMAIL_BACKEND says otherwise
+EMAIL_DELIVERY_BACKEND = env(
+    'EMAIL_BACKEND', 'django.core.mail.backends.filebased.EmailBackend',
+)
+
+QUERY_BUDGET_ENABLED = True
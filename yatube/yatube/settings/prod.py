@@ -0,0 +1,28 @@
+"""Production: no DEBUG, shared cache, hashed static files.
+
+SECRET_KEY and ALLOWED_HOSTS must come from the environment.
+"""
+from .base import *  # noqa: F401,F403
+from .base import cache_settings, env_bool, env_list, env_required
+
+DEBUG = False
+
+SECRET_KEY = env_required('SECRET_KEY')
+ALLOWED_HOSTS = env_list('ALLOWED_HOSTS', [])
+
+# Every worker must see the same feed versions and page cache entries
+CACHES = cache_settings('memcached')
+
+# Hashed file names, so the web server can cache static files forever
+STATICFILES_STORAGE = (
+    'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'
+)
+
+SESSION_COOKIE_SECURE = env_bool('SECURE_COOKIES', True)
+CSRF_COOKIE_SECURE = env_bool('SECURE_COOKIES', True)
+# Trust X-Forwarded-Proto only behind a proxy that sets or strips it,
+# otherwise any client could claim https
+if env_bool('BEHIND_PROXY'):
+    SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
+
+POSTS_PAGE_CACHE = env_bool('PAGE_CACHE', True)